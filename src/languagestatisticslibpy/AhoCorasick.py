@@ -0,0 +1,303 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import mmap
+import os
+import struct
+from bisect import bisect_left
+import numpy as np
+from languagestatisticslibpy.AtomicFileWriter import AtomicFileWriter
+from languagestatisticslibpy.CompactWordTree import CompactWordTree
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton over the words of a dictionary, to find all dictionary words in a text in one pass.
+
+    The states of the automaton are the nodes of a CompactWordTree (its goto function). In addition, each state
+    has a failure link to the state of its longest proper suffix that is also a path in the tree, an output link
+    to the next state on the failure chain where a word ends, and the number of words ending at the state or
+    anywhere on its failure chain.
+
+    Attributes:
+    - tree (CompactWordTree): The tree providing the states and the goto function.
+    - fail (np.ndarray): The failure link of each state (0, the root, if there is none).
+    - output (np.ndarray): The output link of each state (0 if no word ends on the failure chain).
+    - match_counts (np.ndarray): The number of words ending at each state, including its failure chain.
+    - depths (np.ndarray): The depth of each state, i.e. the length of the word ending there.
+
+    Cache files:
+    - The automaton can be stored in an uncompressed sidecar file next to the dictionary
+      (e.g. `Dictionary_en.dic.automaton`), laid out like the snapshots of CompactWordTree, and opened with `mmap`.
+    - A cache file is only used if its format version, the number of states and the size and modification
+      time of the dictionary match; otherwise it is rewritten.
+    """
+
+    CACHE_FILE_MAGIC_NUMBER = b"CTACAUTO"
+    CACHE_FILE_FORMAT_VERSION = 1
+    CACHE_HEADER_FORMAT = '<8sIqqQ'
+    CACHE_ALIGNMENT = 64
+    CACHE_ARRAYS = (("fail", '<u4'), ("output", '<u4'), ("match_counts", '<u4'), ("depths", '<u2'))
+
+    def __init__(self, tree, fail, output, match_counts, depths):
+        """
+        Initializes the automaton from its arrays. Use `build` or `load_cache` to create one.
+
+        Parameters:
+        - tree (CompactWordTree): The tree providing the states and the goto function.
+        - fail (np.ndarray): The failure links.
+        - output (np.ndarray): The output links.
+        - match_counts (np.ndarray): The number of words ending at each state, including its failure chain.
+        - depths (np.ndarray): The depth of each state.
+        """
+        self.tree = tree
+        self.fail = fail
+        self.output = output
+        self.match_counts = match_counts
+        self.depths = depths
+        self.fail_view = memoryview(fail)
+        self.output_view = memoryview(output)
+        self.match_count_view = memoryview(match_counts)
+        self.depth_view = memoryview(depths)
+
+    @staticmethod
+    def build(tree):
+        """
+        Compiles a word tree into an automaton.
+
+        Parameters:
+        - tree (WordTree or CompactWordTree): The dictionary.
+
+        Returns:
+        - AhoCorasick: The automaton.
+
+        Notes:
+        - A WordTree is converted into a CompactWordTree first.
+        - The failure links are computed level by level with vectorized lookups of the sorted edges of the tree,
+          so building takes a few NumPy operations per level instead of a Python loop over all states.
+        """
+        if not isinstance(tree, CompactWordTree):
+            tree = CompactWordTree.from_word_tree(tree)
+        node_count = tree.node_count
+        first_child = tree.first_child.astype(np.int64)
+        labels = tree.labels.astype(np.int64)
+        word_ends = np.unpackbits(tree.word_end_bits, count=node_count).astype(bool)
+
+        parents = np.repeat(np.arange(node_count, dtype=np.int64), np.diff(first_child))
+        edge_keys = tree.edge_keys()
+
+        fail = np.zeros(node_count, dtype=np.int64)
+        output = np.zeros(node_count, dtype=np.int64)
+        match_counts = word_ends.astype(np.int64)
+        match_counts[0] = 0
+        depths = np.zeros(node_count, dtype=np.int64)
+
+        level_start, level_end, depth = 1, int(first_child[1]), 1
+        while level_start < level_end:
+            nodes = np.arange(level_start, level_end)
+            depths[nodes] = depth
+            if depth > 1:
+                targets = np.zeros(len(nodes), dtype=np.int64)
+                candidates = fail[parents[nodes - 1]]
+                pending = np.arange(len(nodes))
+                while pending.size > 0:
+                    keys = (candidates[pending] << 21) | labels[nodes[pending]]
+                    positions = np.minimum(np.searchsorted(edge_keys, keys), len(edge_keys) - 1)
+                    found = edge_keys[positions] == keys
+                    targets[pending[found]] = positions[found] + 1
+                    at_root = ~found & (candidates[pending] == 0)
+                    pending = pending[~found & ~at_root]
+                    candidates[pending] = fail[candidates[pending]]
+                fail[nodes] = targets
+
+            fail_nodes = fail[nodes]
+            output[nodes] = np.where(word_ends[fail_nodes] & (fail_nodes != 0), fail_nodes, output[fail_nodes])
+            match_counts[nodes] += match_counts[fail_nodes]
+            level_start, level_end, depth = level_end, int(first_child[level_end]), depth + 1
+
+        return AhoCorasick(tree, fail.astype(np.uint32), output.astype(np.uint32), match_counts.astype(np.uint32),
+                           depths.astype(np.uint16))
+
+    def step(self, state, char):
+        """
+        Advances the automaton by one character.
+
+        Parameters:
+        - state (int): The current state.
+        - char (str): The (upper-case) character.
+
+        Returns:
+        - int: The next state.
+        """
+        label_view = self.tree.label_view
+        first_child_view = self.tree.first_child_view
+        code = ord(char)
+        while True:
+            end = first_child_view[state + 1]
+            position = bisect_left(label_view, code, first_child_view[state], end)
+            if position < end and label_view[position] == code:
+                return position
+            if state == 0:
+                return 0
+            state = self.fail_view[state]
+
+    def iter_matches(self, text):
+        """
+        Streams a text through the automaton and reports every occurrence of every dictionary word.
+
+        Parameters:
+        - text (str): The text (upper-cased before matching).
+
+        Yields:
+        - tuple: (position, word) for each occurrence, where position is the start index of the (upper-case)
+          word in the upper-cased text. Occurrences are ordered by their end, longer words first.
+        """
+        text = text.upper()
+        word_end_view = self.tree.word_end_view
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = self.step(state, char)
+            match = state if (word_end_view[state >> 3] >> (7 - (state & 7))) & 1 else self.output_view[state]
+            while match != 0:
+                start = end - self.depth_view[match]
+                yield start, text[start:end]
+                match = self.output_view[match]
+
+    def find_all(self, text):
+        """
+        Returns every occurrence of every dictionary word in a text.
+
+        Parameters:
+        - text (str): The text (upper-cased before matching).
+
+        Returns:
+        - list: (position, word) tuples, as yielded by `iter_matches`.
+        """
+        return list(self.iter_matches(text))
+
+    def count_matches(self, text):
+        """
+        Counts the occurrences of dictionary words in a text without creating the matches.
+
+        Parameters:
+        - text (str): The text (upper-cased before matching).
+
+        Returns:
+        - int: The number of (position, word) occurrences `find_all` would return.
+        """
+        match_count_view = self.match_count_view
+        state = 0
+        count = 0
+        for char in text.upper():
+            state = self.step(state, char)
+            count += match_count_view[state]
+        return count
+
+    @staticmethod
+    def cache_file_path(dictionary_path):
+        """
+        Returns the path of the cache file of the automaton belonging to a dictionary.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file.
+
+        Returns:
+        - str: The path of the cache file.
+        """
+        return f"{dictionary_path}.automaton"
+
+    @staticmethod
+    def cache_layout(node_count, header_size):
+        """
+        Computes the offsets of the arrays of a cache file.
+
+        Parameters:
+        - node_count (int): The number of states.
+        - header_size (int): The number of bytes of the header.
+
+        Returns:
+        - tuple: (offsets, file_size), the offset of each array of CACHE_ARRAYS and the total file size.
+        """
+        offsets = []
+        offset = header_size
+        for name, dtype in AhoCorasick.CACHE_ARRAYS:
+            offset = -(-offset // AhoCorasick.CACHE_ALIGNMENT) * AhoCorasick.CACHE_ALIGNMENT
+            offsets.append(offset)
+            offset += node_count * np.dtype(dtype).itemsize
+        return offsets, offset
+
+    @staticmethod
+    def load_cache(dictionary_path, tree):
+        """
+        Opens the cached automaton of a dictionary as a read-only memory map.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file the automaton was built from.
+        - tree (CompactWordTree): The tree of the same dictionary, e.g. opened from its snapshot.
+
+        Returns:
+        - AhoCorasick or None: The automaton, or None if the cache file does not exist or is outdated.
+        """
+        cache_path = AhoCorasick.cache_file_path(dictionary_path)
+        try:
+            source_stat = os.stat(dictionary_path)
+            with open(cache_path, 'rb') as file:
+                header = file.read(struct.calcsize(AhoCorasick.CACHE_HEADER_FORMAT))
+                magic_number, version, source_size, source_mtime, node_count = struct.unpack(AhoCorasick.CACHE_HEADER_FORMAT, header)
+                if magic_number != AhoCorasick.CACHE_FILE_MAGIC_NUMBER or version != AhoCorasick.CACHE_FILE_FORMAT_VERSION:
+                    return None
+                if source_size != source_stat.st_size or source_mtime != source_stat.st_mtime_ns:
+                    return None
+                if node_count != tree.node_count:
+                    return None
+                offsets, file_size = AhoCorasick.cache_layout(node_count, len(header))
+                if os.fstat(file.fileno()).st_size != file_size:
+                    return None
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, struct.error):
+            return None
+
+        arrays = [np.frombuffer(mapped_file, dtype=dtype, count=node_count, offset=offset)
+                  for (name, dtype), offset in zip(AhoCorasick.CACHE_ARRAYS, offsets)]
+        return AhoCorasick(tree, *arrays)
+
+    def write_cache(self, dictionary_path):
+        """
+        Writes the automaton (without its tree) into a cache file next to the dictionary it was built from.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file the automaton was built from.
+
+        Returns:
+        - bool: True if the cache file was written, False if it could not be written (e.g., read-only directory).
+
+        Notes:
+        - The file is written by `AtomicFileWriter`, so concurrent readers never see partial files.
+        """
+        node_count = self.tree.node_count
+        try:
+            source_stat = os.stat(dictionary_path)
+        except OSError:
+            return False
+        header = struct.pack(AhoCorasick.CACHE_HEADER_FORMAT, AhoCorasick.CACHE_FILE_MAGIC_NUMBER,
+                             AhoCorasick.CACHE_FILE_FORMAT_VERSION, source_stat.st_size, source_stat.st_mtime_ns, node_count)
+        offsets = AhoCorasick.cache_layout(node_count, len(header))[0]
+
+        def write_content(file):
+            file.write(header)
+            for (name, dtype), offset in zip(AhoCorasick.CACHE_ARRAYS, offsets):
+                file.write(bytes(offset - file.tell()))
+                np.ascontiguousarray(getattr(self, name), dtype=dtype).tofile(file)
+
+        return AtomicFileWriter.write(AhoCorasick.cache_file_path(dictionary_path), write_content)
@@ -0,0 +1,76 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import os
+import threading
+
+class AtomicFileWriter:
+    """
+    Writes cache and manifest files so that readers never see a partially written file.
+
+    The content is written into a temporary file in the same directory, which is then renamed to the
+    target path. The temporary name contains the process id and the thread id, so concurrent writers of
+    the same file, in different processes or in different threads of one process, never share a temporary
+    file; the last rename wins.
+    """
+
+    @staticmethod
+    def temporary_file_path(path):
+        """
+        Returns the temporary path used by the calling thread to write a file.
+
+        Parameters:
+        - path (str): The path of the file to write.
+
+        Returns:
+        - str: The temporary path next to the file.
+        """
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    @staticmethod
+    def write(path, write_content, binary=True):
+        """
+        Writes a file atomically.
+
+        Parameters:
+        - path (str): The path of the file to write.
+        - write_content (callable): Called with the open temporary file object and writes the content.
+        - binary (bool): Whether to open the file in binary mode; otherwise text mode with UTF-8 is used (default: True).
+
+        Returns:
+        - bool: True if the file was written, False if it could not be written (e.g., read-only directory).
+
+        Raises:
+        - Exception: Any non-OSError exception of `write_content`, after removing the temporary file.
+        """
+        temporary_path = AtomicFileWriter.temporary_file_path(path)
+        try:
+            if binary:
+                with open(temporary_path, 'wb') as file:
+                    write_content(file)
+            else:
+                with open(temporary_path, 'w', encoding='utf-8') as file:
+                    write_content(file)
+            os.replace(temporary_path, path)
+        except BaseException as e:
+            if os.path.exists(temporary_path):
+                try:
+                    os.remove(temporary_path)
+                except OSError:
+                    pass
+            if isinstance(e, OSError):
+                return False
+            raise
+        return True
@@ -21,7 +21,7 @@ from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFil
 
 
 class Bigrams(Grams):
-    def __init__(self, language, language_statistics_directory, use_spaces=False):
+    def __init__(self, language, language_statistics_directory, use_spaces=False, use_cache=False, normalize_to=None, lazy=False, progress_callback=None):
         """
         Initializes the Bigrams class by calling the parent class (Grams) initializer.
 
@@ -29,16 +29,23 @@ class Bigrams(Grams):
         - language (str): The language of the bigram statistics.
         - language_statistics_directory (str): Path to the directory containing language statistics files.
         - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - lazy (bool): If True, only the file header is read now and the frequencies are loaded on first use (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
         """
-        super().__init__(language, language_statistics_directory, use_spaces)
+        super().__init__(language, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
 
-    def load_gz(self, filename, language_statistics_directory):
+    def load_gz(self, filename, language_statistics_directory, progress_callback=None):
         """
         Loads a gzip-compressed file containing bigram frequencies.
 
         Parameters:
         - filename (str): The name of the file to load.
         - language_statistics_directory (str): The directory where the statistics file is located.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each
+          chunk of frequency data read from the .gz file (default: None).
 
         Sets:
         - self.frequencies (np.ndarray): A 2D array of bigram frequencies.
@@ -47,7 +54,7 @@ class Bigrams(Grams):
         """
         file_path = os.path.join(language_statistics_directory, filename)
         language_statistics_file = LanguageStatisticsFile(file_path)
-        self.frequencies = language_statistics_file.load_frequencies(2)
+        self.frequencies = language_statistics_file.load_frequencies(2, self.cache_raw_frequencies, progress_callback)
         self.alphabet = language_statistics_file.alphabet
         self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
 
@@ -56,35 +63,21 @@ class Bigrams(Grams):
         Calculates the cost of a given text based on bigram frequencies.
 
         Parameters:
-        - text (str): The text to analyze.
+        - text (list or np.ndarray): The text to analyze, mapped into number space.
 
         Returns:
         - float: The average cost of bigrams in the text. Returns 0 if the text length is less than 2.
 
         Notes:
+        - The text may be a list or a NumPy array of symbol indices; all windows are scored in one vectorized pass.
         - Skips bigrams containing characters outside the defined alphabet.
         - If `add_letter_indices` is defined, modifies indices of the characters before computing the cost.
         """
         if len(text) < 2:
             return 0
 
-        value = 0
-        alphabet_length = len(self.alphabet)
         end = len(text) - 1
-
-        for i in range(end):
-            a = text[i]
-            b = text[i + 1]
-
-            if self.add_letter_indices:
-                a += self.add_letter_indices[a]
-                b += self.add_letter_indices[b]
-
-            if a >= alphabet_length or b >= alphabet_length or a < 0 or b < 0:
-                continue
-            value += self.frequencies[a, b]
-
-        return value / end
+        return self.sum_of_costs(text) / end
 
     def gram_size(self):
         """
@@ -103,22 +96,3 @@ class Bigrams(Grams):
         - GramsType: An enum value representing the type of grams (GramsType.Bigrams).
         """
         return GramsType.Bigrams
-
-    def normalize(self, max_value):
-        """
-        Normalizes the bigram frequencies based on the provided maximum value.
-
-        Parameters:
-        - max_value (float): The maximum value used for normalization.
-
-        Notes:
-        - Adjusts all frequencies proportionally to the new maximum value.
-        - Updates `self.max_value` to the new maximum after normalization.
-        """
-        super().normalize(max_value)
-        adjust_value = self.max_value * max_value
-        for a in range(len(self.alphabet)):
-            for b in range(len(self.alphabet)):
-                self.frequencies[a, b] = adjust_value / self.frequencies[a, b]
-        self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
-
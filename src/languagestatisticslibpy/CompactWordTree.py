@@ -0,0 +1,504 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from io import BufferedReader
+import numpy as np
+from languagestatisticslibpy.AtomicFileWriter import AtomicFileWriter
+from languagestatisticslibpy.Node import Node
+from languagestatisticslibpy.WordTree import WordTree
+from languagestatisticslibpy.WordQueries import WordQueries
+
+class CompactWordTree(WordQueries):
+    """
+    Memory-efficient, array-backed version of the WordTree with the same queries (see `WordQueries`).
+
+    The nodes are numbered in breadth-first order, with the children of each node sorted by character.
+    So the children of node i are exactly the nodes `first_child[i]` to `first_child[i + 1] - 1`, and a child
+    is found with a binary search over their labels. Node 0 is the root. Instead of one Python object per
+    node, the whole tree consists of three flat arrays:
+
+    Attributes:
+    - labels (np.ndarray): The code point of the character of each node (0 for the root).
+    - first_child (np.ndarray): The index of the first child of each node; has one additional entry at the end.
+    - word_end_bits (np.ndarray): Bitmap (np.packbits order) of the nodes that mark the end of a word.
+    - node_count (int): The number of nodes, including the root.
+    - stored_words (int): The number of words stored in the tree.
+    - language_code (str): The language code for the words stored in the tree.
+    - alphabet (str): The alphabet used in the stored words.
+    - edge_key_table (np.ndarray or None): The sorted edge keys used by `children`, computed on first use.
+
+    Snapshot files:
+    - A snapshot is an uncompressed sidecar file next to the dictionary (e.g. `Dictionary_en.dic.snapshot`).
+    - It consists of a header (magic number, format version, size and modification time of the dictionary,
+      number of nodes, number of stored words, label size, language code and alphabet), padded to
+      SNAPSHOT_ALIGNMENT bytes, followed by the labels, the child offsets and the end-of-word bitmap, each
+      starting at a multiple of SNAPSHOT_ALIGNMENT.
+    - The arrays are used directly from a read-only `mmap`, so opening a snapshot takes no time regardless of
+      the size of the dictionary, and its pages are shared between processes via the operating system's page cache.
+    - A snapshot is only used if its format version and the size and modification time of the dictionary
+      match; otherwise it is rewritten.
+    """
+
+    SNAPSHOT_FILE_MAGIC_NUMBER = b"CTWTSNAP"
+    SNAPSHOT_FILE_FORMAT_VERSION = 1
+    SNAPSHOT_HEADER_FORMAT = '<8sIqqQqB'
+    SNAPSHOT_ALIGNMENT = 64
+
+    def __init__(self, labels, first_child, word_end_bits, language_code='', alphabet='', stored_words=0):
+        """
+        Initializes the tree from its arrays. Use `deserialize` or `from_word_tree` to build one.
+
+        Parameters:
+        - labels (np.ndarray): The code point of the character of each node.
+        - first_child (np.ndarray): The index of the first child of each node, plus one final entry.
+        - word_end_bits (np.ndarray): The packed end-of-word bitmap.
+        - language_code (str): The language code (default: '').
+        - alphabet (str): The alphabet (default: '').
+        - stored_words (int): The number of stored words (default: 0).
+        """
+        self.labels = labels
+        self.first_child = first_child
+        self.word_end_bits = word_end_bits
+        self.node_count = len(labels)
+        self.language_code = language_code
+        self.alphabet = alphabet
+        self.stored_words = stored_words
+        # Memoryviews return plain Python ints when indexed, which is much faster than indexing NumPy arrays.
+        self.label_view = memoryview(labels)
+        self.first_child_view = memoryview(first_child)
+        self.word_end_view = memoryview(word_end_bits)
+        self.edge_key_table = None
+
+    @staticmethod
+    def deserialize(reader: BufferedReader):
+        """
+        Builds a CompactWordTree directly from a serialized WordTree, without creating Node objects.
+
+        Parameters:
+        - reader (BufferedReader): A binary file reader containing the serialized WordTree.
+
+        Returns:
+        - CompactWordTree: The tree.
+
+        Raises:
+        - Exception: If the file format is invalid or the magic number does not match.
+        """
+        language_code, alphabet, stored_words = WordTree.read_header(reader)
+        body = str(reader.read(), 'utf-8')
+
+        parents = [-1]
+        labels = [0]
+        word_ends = [0]
+        depths = [0]
+        stack = [0]
+        for run in WordTree.BODY_RUN_PATTERN.findall(body):
+            first = run[0]
+            if first == Node.TerminationSymbol:
+                del stack[-len(run):]
+            elif first == Node.WordEndSymbol:
+                word_ends[stack[-1]] = 1
+            else:
+                parent = stack[-1]
+                for char in run:
+                    node = len(labels)
+                    parents.append(parent)
+                    labels.append(ord(char))
+                    word_ends.append(0)
+                    depths.append(len(stack))
+                    stack.append(node)
+                    parent = node
+
+        return CompactWordTree.from_parent_arrays(parents, labels, word_ends, depths, language_code, alphabet,
+                                                  stored_words + body.count(Node.WordEndSymbol))
+
+    @staticmethod
+    def from_word_tree(tree):
+        """
+        Builds a CompactWordTree from a WordTree.
+
+        Parameters:
+        - tree (WordTree): The tree to convert.
+
+        Returns:
+        - CompactWordTree: The tree with the same words, language code, alphabet and number of stored words.
+        """
+        parents = [-1]
+        labels = [0]
+        word_ends = [1 if tree.word_ends_here else 0]
+        depths = [0]
+        stack = [(tree, 0)]
+        while stack:
+            node, index = stack.pop()
+            for child_node in node.child_nodes.values():
+                parents.append(index)
+                labels.append(ord(child_node.value))
+                word_ends.append(1 if child_node.word_ends_here else 0)
+                depths.append(depths[index] + 1)
+                stack.append((child_node, len(labels) - 1))
+
+        return CompactWordTree.from_parent_arrays(parents, labels, word_ends, depths, tree.language_code, tree.alphabet,
+                                                  tree.stored_words)
+
+    @staticmethod
+    def from_parent_arrays(parents, labels, word_ends, depths, language_code='', alphabet='', stored_words=0):
+        """
+        Builds a CompactWordTree from a list of nodes that starts with the root.
+
+        Parameters:
+        - parents (list): The index of the parent of each node; -1 for the root (node 0).
+        - labels (list): The code point of the character of each node.
+        - word_ends (list): 1 for each node that marks the end of a word, otherwise 0.
+        - depths (list): The distance of each node from the root.
+        - language_code (str): The language code (default: '').
+        - alphabet (str): The alphabet (default: '').
+        - stored_words (int): The number of stored words (default: 0).
+
+        Returns:
+        - CompactWordTree: The tree.
+
+        Notes:
+        - The nodes are renumbered level by level, ordered by the new index of their parent and by their label.
+        """
+        parents = np.array(parents, dtype=np.int64)
+        labels = np.array(labels, dtype=np.int64)
+        word_ends = np.array(word_ends, dtype=bool)
+        depths = np.array(depths, dtype=np.int64)
+        count = len(labels)
+
+        by_depth = np.argsort(depths, kind='stable')
+        level_starts = np.searchsorted(depths[by_depth], np.arange(depths.max(initial=0) + 2))
+
+        new_index = np.zeros(count, dtype=np.int64)
+        for level in range(1, len(level_starts) - 1):
+            start, end = level_starts[level], level_starts[level + 1]
+            nodes = by_depth[start:end]
+            nodes = nodes[np.lexsort((labels[nodes], new_index[parents[nodes]]))]
+            new_index[nodes] = np.arange(start, end)
+
+        new_labels = np.zeros(count, dtype=np.int64)
+        new_labels[new_index] = labels
+        new_word_ends = np.zeros(count, dtype=bool)
+        new_word_ends[new_index] = word_ends
+        child_counts = np.bincount(new_index[parents[1:]], minlength=count)
+        first_child = np.concatenate(([1], 1 + np.cumsum(child_counts))).astype(np.uint32)
+
+        label_dtype = np.uint8 if new_labels.max(initial=0) < 1 << 8 else np.uint16 if new_labels.max() < 1 << 16 else np.uint32
+        return CompactWordTree(new_labels.astype(label_dtype), first_child, np.packbits(new_word_ends),
+                               language_code, alphabet, stored_words)
+
+    def root_node(self):
+        """
+        Returns the root node of the tree.
+
+        Returns:
+        - int: The index of the root node (0).
+        """
+        return 0
+
+    def word_ends_at(self, node):
+        """
+        Returns whether a node marks the end of a word.
+
+        Parameters:
+        - node (int): The index of the node.
+
+        Returns:
+        - bool: True if a word ends at the node.
+        """
+        return (self.word_end_view[node >> 3] >> (7 - (node & 7))) & 1 == 1
+
+    def child(self, node, char):
+        """
+        Looks up the child of a node for a character.
+
+        Parameters:
+        - node (int): The index of the node.
+        - char (str): The character.
+
+        Returns:
+        - int or None: The index of the child node, or None if there is none.
+        """
+        code = ord(char)
+        end = self.first_child_view[node + 1]
+        position = bisect_left(self.label_view, code, self.first_child_view[node], end)
+        if position < end and self.label_view[position] == code:
+            return position
+        return None
+
+    def edge_keys(self):
+        """
+        Returns the sorted (parent, label) keys of all edges of the tree, for vectorized child lookups.
+
+        Returns:
+        - np.ndarray: An int64 array; entry i is `(parent << 21) | label` of node i + 1.
+
+        Notes:
+        - In breadth-first order with sorted children, the edge into node i + 1 has the i-th smallest key,
+          so the keys are already sorted for binary searches. They are computed once and kept.
+        """
+        if self.edge_key_table is None:
+            first_child = self.first_child.astype(np.int64)
+            parents = np.repeat(np.arange(self.node_count, dtype=np.int64), np.diff(first_child))
+            self.edge_key_table = (parents << 21) | self.labels[1:].astype(np.int64)
+        return self.edge_key_table
+
+    def children(self, nodes, codes):
+        """
+        Looks up the children of many nodes at once.
+
+        Parameters:
+        - nodes (np.ndarray): The indices of the nodes.
+        - codes (np.ndarray): The code point of the character to follow from each node.
+
+        Returns:
+        - np.ndarray: The int64 index of each child node, or -1 where there is none.
+        """
+        edge_keys = self.edge_keys()
+        if edge_keys.size == 0:
+            return np.full(len(nodes), -1, dtype=np.int64)
+        keys = (np.asarray(nodes, dtype=np.int64) << 21) | np.asarray(codes, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(edge_keys, keys), edge_keys.size - 1)
+        return np.where(edge_keys[positions] == keys, positions + 1, -1)
+
+    def coverage_batch(self, texts, min_word_length=1):
+        """
+        Returns the dictionary coverage of many candidate texts, e.g. as a fitness function in a search loop.
+
+        Parameters:
+        - texts (iterable): The texts; candidates in number space can be converted with
+          `LanguageStatistics.map_number_matrix_into_text_space`.
+        - min_word_length (int): Words shorter than this do not count (default: 1).
+
+        Returns:
+        - np.ndarray: A 1D float64 array with the coverage of each text, equal to `coverage` of each text.
+
+        Notes:
+        - Runs the dynamic program of `segment_table` for all texts together: the texts are stored as rows of a
+          2-D array of code points, and for each start position the tree walks of all rows advance together with
+          one vectorized child lookup per character. The Python work therefore depends on the length of the texts
+          and the depth of the tree, not on the number of candidates.
+        - Shorter texts are padded with code point 0, which never matches a word.
+        """
+        texts = [text.upper() for text in texts]
+        count = len(texts)
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        length = int(lengths.max(initial=0))
+        codes = np.zeros((count, length), dtype=np.int64)
+        codes[np.arange(length) < lengths[:, None]] = np.frombuffer("".join(texts).encode('utf-32-le'), dtype=np.uint32)
+        word_ends = np.unpackbits(self.word_end_bits, count=self.node_count).astype(bool)
+
+        # covered[:, i] is the best number of covered characters of the first i characters of each text.
+        covered = np.zeros((count, length + 1), dtype=np.int64)
+        all_rows = np.arange(count)
+        for start in range(length):
+            # Leave the character uncovered.
+            np.maximum(covered[:, start + 1], covered[:, start], out=covered[:, start + 1])
+            base = covered[:, start]
+            # Cover text[start:end] with a word, for all texts at once.
+            rows = all_rows
+            nodes = np.zeros(count, dtype=np.int64)
+            for end in range(start + 1, length + 1):
+                nodes = self.children(nodes, codes[rows, end - 1])
+                found = nodes >= 0
+                rows, nodes = rows[found], nodes[found]
+                if rows.size == 0:
+                    break
+                if end - start < min_word_length:
+                    continue
+                matched = rows[word_ends[nodes]]
+                covered[matched, end] = np.maximum(covered[matched, end], base[matched] + end - start)
+
+        result = np.zeros(count, dtype=np.float64)
+        nonempty = lengths > 0
+        result[nonempty] = covered[nonempty, lengths[nonempty]] / lengths[nonempty]
+        return result
+
+    def child_items(self, node):
+        """
+        Returns the children of a node.
+
+        Parameters:
+        - node (int): The index of the node.
+
+        Returns:
+        - list: (character, child index) pairs, sorted by character.
+        """
+        return [(chr(self.label_view[child]), child) for child in range(self.first_child_view[node], self.first_child_view[node + 1])]
+
+    def find_node(self, word):
+        """
+        Follows the characters of a word from the root.
+
+        Parameters:
+        - word (str): The (already upper-cased) word.
+
+        Returns:
+        - int or None: The index of the node reached after the last character, or None if the path does not exist.
+        """
+        label_view = self.label_view
+        first_child_view = self.first_child_view
+        node = 0
+        for char in word:
+            code = ord(char)
+            end = first_child_view[node + 1]
+            node = bisect_left(label_view, code, first_child_view[node], end)
+            if node == end or label_view[node] != code:
+                return None
+        return node
+
+    def to_list(self):
+        """
+        Converts all words stored in the tree into a list.
+
+        Returns:
+        - list: A list of all words stored in the tree, in the order of their characters' code points.
+        """
+        list_of_words = []
+        labels = self.labels.tolist()
+        first_child = self.first_child.tolist()
+        word_ends = np.unpackbits(self.word_end_bits, count=self.node_count).tolist()
+        stack = [(node, chr(labels[node])) for node in range(first_child[1] - 1, first_child[0] - 1, -1)]
+        while stack:
+            node, word = stack.pop()
+            if word_ends[node]:
+                list_of_words.append(word)
+            for child in range(first_child[node + 1] - 1, first_child[node] - 1, -1):
+                stack.append((child, word + chr(labels[child])))
+        return list_of_words
+
+    def memory_bytes(self):
+        """
+        Returns the number of bytes of the arrays of the tree.
+
+        Returns:
+        - int: The memory used by labels, child offsets and the end-of-word bitmap.
+        """
+        return self.labels.nbytes + self.first_child.nbytes + self.word_end_bits.nbytes
+
+    @staticmethod
+    def snapshot_file_path(dictionary_path):
+        """
+        Returns the path of the snapshot file belonging to a dictionary.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file.
+
+        Returns:
+        - str: The path of the snapshot file.
+        """
+        return f"{dictionary_path}.snapshot"
+
+    @staticmethod
+    def snapshot_layout(node_count, label_itemsize, header_size):
+        """
+        Computes the offsets of the arrays of a snapshot file.
+
+        Parameters:
+        - node_count (int): The number of nodes.
+        - label_itemsize (int): The number of bytes per label.
+        - header_size (int): The number of bytes of the unpadded header.
+
+        Returns:
+        - tuple: (labels_offset, first_child_offset, word_end_offset, file_size)
+        """
+        def align(offset):
+            return -(-offset // CompactWordTree.SNAPSHOT_ALIGNMENT) * CompactWordTree.SNAPSHOT_ALIGNMENT
+
+        labels_offset = align(header_size)
+        first_child_offset = align(labels_offset + node_count * label_itemsize)
+        word_end_offset = align(first_child_offset + (node_count + 1) * 4)
+        return labels_offset, first_child_offset, word_end_offset, word_end_offset + -(-node_count // 8)
+
+    @staticmethod
+    def load_snapshot(dictionary_path):
+        """
+        Opens the snapshot file of a dictionary as a read-only memory map.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file the snapshot was created from.
+
+        Returns:
+        - CompactWordTree or None: The tree backed by the mapped file, or None if the snapshot does not exist or is outdated.
+        """
+        snapshot_path = CompactWordTree.snapshot_file_path(dictionary_path)
+        try:
+            source_stat = os.stat(dictionary_path)
+            with open(snapshot_path, 'rb') as file:
+                header = file.read(struct.calcsize(CompactWordTree.SNAPSHOT_HEADER_FORMAT))
+                (magic_number, version, source_size, source_mtime, node_count, stored_words,
+                 label_itemsize) = struct.unpack(CompactWordTree.SNAPSHOT_HEADER_FORMAT, header)
+                language_code = file.read(file.read(1)[0]).decode('utf-8')
+                alphabet = file.read(struct.unpack('<H', file.read(2))[0]).decode('utf-8')
+                header_size = file.tell()
+
+                if magic_number != CompactWordTree.SNAPSHOT_FILE_MAGIC_NUMBER or version != CompactWordTree.SNAPSHOT_FILE_FORMAT_VERSION:
+                    return None
+                if source_size != source_stat.st_size or source_mtime != source_stat.st_mtime_ns:
+                    return None
+                if label_itemsize not in (1, 2, 4):
+                    return None
+                labels_offset, first_child_offset, word_end_offset, file_size = CompactWordTree.snapshot_layout(
+                    node_count, label_itemsize, header_size)
+                if os.fstat(file.fileno()).st_size != file_size:
+                    return None
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, struct.error, IndexError, UnicodeDecodeError):
+            return None
+
+        labels = np.frombuffer(mapped_file, dtype=f'<u{label_itemsize}', count=node_count, offset=labels_offset)
+        first_child = np.frombuffer(mapped_file, dtype='<u4', count=node_count + 1, offset=first_child_offset)
+        word_end_bits = np.frombuffer(mapped_file, dtype=np.uint8, count=file_size - word_end_offset, offset=word_end_offset)
+        return CompactWordTree(labels, first_child, word_end_bits, language_code, alphabet, stored_words)
+
+    def write_snapshot(self, dictionary_path):
+        """
+        Writes the tree into a snapshot file next to the dictionary it was built from.
+
+        Parameters:
+        - dictionary_path (str): The path to the dictionary (.dic) file the tree was built from.
+
+        Returns:
+        - bool: True if the snapshot was written, False if it could not be written (e.g., read-only directory).
+
+        Notes:
+        - The file is written by `AtomicFileWriter`, so concurrent readers never see partial files.
+        """
+        language_code = self.language_code.encode('utf-8')
+        alphabet = self.alphabet.encode('utf-8')
+        try:
+            source_stat = os.stat(dictionary_path)
+        except OSError:
+            return False
+        header = struct.pack(CompactWordTree.SNAPSHOT_HEADER_FORMAT, CompactWordTree.SNAPSHOT_FILE_MAGIC_NUMBER,
+                             CompactWordTree.SNAPSHOT_FILE_FORMAT_VERSION, source_stat.st_size, source_stat.st_mtime_ns,
+                             self.node_count, self.stored_words, self.labels.itemsize)
+        header += bytes([len(language_code)]) + language_code + struct.pack('<H', len(alphabet)) + alphabet
+        labels_offset, first_child_offset, word_end_offset = CompactWordTree.snapshot_layout(
+            self.node_count, self.labels.itemsize, len(header))[:3]
+        arrays = ((labels_offset, self.labels.astype(self.labels.dtype.newbyteorder('<'), copy=False)),
+                  (first_child_offset, self.first_child.astype('<u4', copy=False)),
+                  (word_end_offset, self.word_end_bits))
+
+        def write_content(file):
+            file.write(header)
+            for offset, array in arrays:
+                file.write(bytes(offset - file.tell()))
+                np.ascontiguousarray(array).tofile(file)
+
+        return AtomicFileWriter.write(CompactWordTree.snapshot_file_path(dictionary_path), write_content)
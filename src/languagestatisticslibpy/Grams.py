@@ -14,9 +14,13 @@
    limitations under the License.
 '''
 from abc import ABC, abstractmethod
+import numpy as np
+import os
+import threading
+from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
 
 class Grams(ABC):
-    def __init__(self, language, language_statistics_directory, use_spaces):
+    def __init__(self, language, language_statistics_directory, use_spaces, use_cache=False, normalize_to=None, lazy=False, progress_callback=None):
         """
         Initializes the Grams superclass.
 
@@ -24,29 +28,182 @@ class Grams(ABC):
         - language (str): The language of the n-gram statistics.
         - language_statistics_directory (str): Path to the directory containing language statistics files.
         - use_spaces (bool): Whether to include spaces in the analysis.
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading.
+          Together with `use_cache`, only the normalized table is cached: a valid normalized cache file is opened
+          without reading the .gz file or a raw cache file at all (default: None).
+        - lazy (bool): If True, only the header of the statistics file is read now. The frequencies are loaded
+          (and normalized to `normalize_to`) on first use, e.g. by `calculate_cost`, `normalize` or accessing
+          `frequencies` (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file, also when a lazy grams object is loaded later (default: None).
 
         Initializes:
+        - self.language (str): The language of the n-gram statistics.
         - self.max_value (float): The maximum value of the frequencies, set during file loading.
         - self.is_normalized (bool): Tracks whether the frequencies have been normalized.
         - self.alphabet (list): The alphabet used in the statistics file.
         - self.add_letter_indices (list): Adjustment indices for characters when reducing the alphabet.
+        - self.use_cache (bool): Whether memory-mapped cache files are used.
+        - self.cache_raw_frequencies (bool): Whether `load_gz` uses a cache file of the raw (not normalized) table;
+          False if a normalized table is requested, since only that one is kept.
+        - self.file_path (str): The path of the language statistics file.
+        - self.quantization_scale (float or None): The scale of integer-quantized frequencies, None if not quantized.
+        - self.quantization_offset (float): The offset of integer-quantized frequencies.
+        - self.pending_load (tuple or None): The arguments of the deferred load of a lazy grams object
+          (file name, directory, normalization value and progress callback), None once loaded.
 
         Raises:
         - Exception: If the specified language statistics file is not found.
         """
+        self.pending_load = None
+        self.materialize_lock = threading.RLock()
+        self.materializing = False
+        self.language = language
         self.max_value = None
         self.is_normalized = False
         self.alphabet = None
         self.add_letter_indices = None
+        self.use_cache = use_cache
+        self.cache_raw_frequencies = use_cache and normalize_to is None
+        self.quantization_scale = None
+        self.quantization_offset = 0.0
 
         # Construct the filename based on language and space usage.
         filename = f"{language}-{self.gram_size()}gram-nocs{'-sp' if use_spaces else ''}.gz"
+        self.file_path = os.path.join(language_statistics_directory, filename)
         try:
+            if lazy:
+                # Only read the header now; the frequencies are loaded by `materialize`.
+                self.load_header()
+                self.pending_load = (filename, language_statistics_directory, normalize_to, progress_callback)
+                return
             # Attempt to load the gzipped language statistics file.
-            self.load_gz(filename, language_statistics_directory)
+            self.load_statistics(filename, language_statistics_directory, normalize_to, progress_callback)
         except FileNotFoundError as e:
             raise Exception(f"Did not find the specified language statistics file for language={language} and use_spaces={use_spaces}: {filename}") from e
 
+    @classmethod
+    def from_frequencies(cls, language, alphabet, frequencies, max_value=None, is_normalized=False):
+        """
+        Creates a grams object from an existing frequency table instead of loading a statistics file.
+
+        Parameters:
+        - language (str): The language of the n-gram statistics.
+        - alphabet (str): The alphabet of the frequency table.
+        - frequencies (np.ndarray): The frequency table; it is used as is, without copying.
+        - max_value (float or None): The maximum value of the frequencies (default: maximum of the table).
+        - is_normalized (bool): Whether the frequencies are already normalized (default: False).
+
+        Returns:
+        - Grams: A grams object of the calling class that uses the given frequency table.
+
+        Raises:
+        - Exception: If the dimensionality of the table does not match the gram size of the class.
+        """
+        grams = cls.__new__(cls)
+        grams.pending_load = None
+        grams.materialize_lock = threading.RLock()
+        grams.materializing = False
+        if frequencies.ndim != grams.gram_size():
+            raise Exception("Gram size of the grams class differs from the dimensions of the frequency array.")
+        grams.language = language
+        grams.alphabet = alphabet
+        grams.frequencies = frequencies
+        grams.max_value = max_value if max_value is not None else (np.max(frequencies) if frequencies.size > 0 else float('-inf'))
+        grams.is_normalized = is_normalized
+        grams.add_letter_indices = None
+        grams.use_cache = False
+        grams.cache_raw_frequencies = False
+        grams.file_path = None
+        grams.quantization_scale = None
+        grams.quantization_offset = 0.0
+        return grams
+
+    @property
+    def frequencies(self):
+        """
+        The frequency table. Accessing it loads the frequencies of a lazy grams object.
+        """
+        if self.pending_load is not None:
+            self.materialize()
+        return self.table
+
+    @frequencies.setter
+    def frequencies(self, frequencies):
+        self.table = frequencies
+
+    def __getstate__(self):
+        """
+        Returns the state for pickling, without the (unpicklable) materialization lock and progress callback.
+        """
+        state = self.__dict__.copy()
+        del state["materialize_lock"]
+        if state["pending_load"] is not None:
+            state["pending_load"] = state["pending_load"][:3] + (None,)
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores the state after unpickling and creates a new materialization lock.
+        """
+        self.__dict__.update(state)
+        self.materialize_lock = threading.RLock()
+
+    def load_header(self):
+        """
+        Reads only the header of the statistics file and sets the alphabet.
+
+        Raises:
+        - Exception: If the gram length of the statistics file differs from the gram size.
+        - FileNotFoundError: If the file does not exist.
+        """
+        language_statistics_file = LanguageStatisticsFile(self.file_path)
+        if language_statistics_file.load_header() != self.gram_size():
+            raise Exception("Gram length of statistics file differs from required dimensions of frequency array.")
+        self.alphabet = language_statistics_file.alphabet
+
+    def materialize(self):
+        """
+        Loads the frequencies of a lazy grams object and applies its pending normalization.
+
+        Notes:
+        - Does nothing if the frequencies are already loaded.
+        - Thread-safe: concurrent callers wait for a single load.
+        """
+        with self.materialize_lock:
+            # `materializing` stops the loading thread itself from recursing when it accesses `frequencies`.
+            if self.pending_load is None or self.materializing:
+                return
+            self.materializing = True
+            try:
+                filename, language_statistics_directory, normalize_to, progress_callback = self.pending_load
+                self.load_statistics(filename, language_statistics_directory, normalize_to, progress_callback)
+                self.pending_load = None
+            finally:
+                self.materializing = False
+
+    def load_statistics(self, filename, language_statistics_directory, normalize_to=None, progress_callback=None):
+        """
+        Loads the frequencies of the statistics file and normalizes them if requested.
+
+        Parameters:
+        - filename (str): The name of the file to load.
+        - language_statistics_directory (str): The directory where the statistics file is located.
+        - normalize_to (float or None): If given, the frequencies are normalized to this value (default: None).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
+
+        Notes:
+        - With `self.use_cache` and `normalize_to`, a valid normalized cache file is opened first, and the
+          .gz file is only read (without writing a raw cache file) if there is none.
+        """
+        if normalize_to is not None and self.use_cache and self.load_cached_normalized(normalize_to):
+            return
+        self.load_gz(filename, language_statistics_directory, progress_callback)
+        if normalize_to is not None:
+            self.load_normalized(normalize_to)
+
     @abstractmethod
     def calculate_cost(self, text):
         """
@@ -81,13 +238,15 @@ class Grams(ABC):
         ...
 
     @abstractmethod
-    def load_gz(self, filename, language_statistics_directory):
+    def load_gz(self, filename, language_statistics_directory, progress_callback=None):
         """
         Abstract method to load a gzipped file containing n-gram frequencies.
 
         Parameters:
         - filename (str): The name of the file to load.
         - language_statistics_directory (str): The directory where the statistics file is located.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each
+          chunk of frequency data read from the .gz file (default: None).
 
         Raises:
         - FileNotFoundError: If the file does not exist.
@@ -116,6 +275,365 @@ class Grams(ABC):
                 add_value += 1
             self.add_letter_indices[i] = add_value
 
+    def map_symbols(self, text):
+        """
+        Converts a text in number space into a NumPy array of symbol indices.
+
+        Parameters:
+        - text (list or np.ndarray): The text in number space.
+
+        Returns:
+        - np.ndarray: A 1D int64 array of symbol indices.
+
+        Notes:
+        - If `add_letter_indices` is defined, the adjustment of each symbol is applied to the array.
+          Symbols without an adjustment entry are left unchanged.
+        """
+        symbols = np.asarray(text, dtype=np.int64)
+        if self.add_letter_indices:
+            add_letter_indices = np.asarray(self.add_letter_indices, dtype=np.int64)
+            has_adjustment = (symbols >= 0) & (symbols < len(add_letter_indices))
+            adjustment = add_letter_indices[np.where(has_adjustment, symbols, 0)]
+            symbols = symbols + np.where(has_adjustment, adjustment, 0)
+        return symbols
+
+    def flat_gram_indices(self, text):
+        """
+        Computes the flat index into `self.frequencies` of every n-gram window of a text.
+
+        Parameters:
+        - text (list or np.ndarray): The text in number space. A 2D array is treated as one text per row.
+
+        Returns:
+        - tuple: (indices, valid), two arrays with one entry per window (along the last axis).
+          `indices` holds the flat n-gram indices, `valid` is False for windows containing a symbol
+          outside the alphabet. Invalid windows get the index 0, so they can be used for lookups safely.
+
+        Notes:
+        - The indices are built with rolling base-|alphabet| arithmetic, i.e. for a 3-gram (a, b, c)
+          the index is (a * base + b) * base + c, which matches the C-order layout of the table.
+        """
+        symbols = self.map_symbols(text)
+        size = self.gram_size()
+        windows = symbols.shape[-1] - size + 1
+        if windows <= 0:
+            shape = symbols.shape[:-1] + (0,)
+            return np.zeros(shape, dtype=np.int64), np.zeros(shape, dtype=bool)
+
+        base = self.table_dimension()
+        valid_symbols = (symbols >= 0) & (symbols < len(self.alphabet))
+        symbols = np.where(valid_symbols, symbols, 0)
+
+        indices = symbols[..., :windows].copy()
+        valid = valid_symbols[..., :windows].copy()
+        for offset in range(1, size):
+            indices *= base
+            indices += symbols[..., offset:offset + windows]
+            valid &= valid_symbols[..., offset:offset + windows]
+        indices[~valid] = 0
+        return indices, valid
+
+    def table_dimension(self):
+        """
+        Returns the number of entries of the frequency table along each axis.
+
+        Returns:
+        - int: The base used for computing flat n-gram indices.
+        """
+        return self.frequencies.shape[0]
+
+    def table_bytes(self):
+        """
+        Returns the memory used by the frequency table.
+
+        Returns:
+        - int: The number of bytes of `frequencies`.
+        """
+        return self.frequencies.nbytes
+
+    def lookup(self, indices):
+        """
+        Looks up the table entries of many flat n-gram indices.
+
+        Parameters:
+        - indices (np.ndarray): Flat n-gram indices, as computed by `flat_gram_indices`.
+
+        Returns:
+        - np.ndarray: The table entries, in the storage type of the table (see `dequantize_sum`).
+        """
+        return np.take(self.frequencies.ravel(), indices)
+
+    def lookup_value(self, index):
+        """
+        Looks up the table entry of a single flat n-gram index.
+
+        Parameters:
+        - index (int): A flat n-gram index.
+
+        Returns:
+        - float: The table entry, in the storage type of the table (see `dequantize_sum`).
+        """
+        return self.frequencies.item(index)
+
+    def sum_of_costs(self, text):
+        """
+        Sums up the frequencies of all valid n-gram windows of a text in one vectorized pass.
+
+        Parameters:
+        - text (list or np.ndarray): The text in number space.
+
+        Returns:
+        - float: The sum of the frequencies of all windows that lie completely inside the alphabet.
+        """
+        indices, valid = self.flat_gram_indices(text)
+        values = self.lookup(indices[valid])
+        return float(self.dequantize_sum(values.sum(dtype=np.float64), len(values)))
+
+    def dequantize_sum(self, value_sum, count):
+        """
+        Converts a sum of table entries into a sum of costs.
+
+        Parameters:
+        - value_sum (float or np.ndarray): The sum(s) of table entries as stored in `self.frequencies`.
+        - count (int or np.ndarray): The number of summed entries.
+
+        Returns:
+        - float or np.ndarray: The sum(s) of costs. For integer-quantized tables, each entry e stands for the
+          cost e * quantization_scale + quantization_offset; otherwise the sum is returned unchanged.
+        """
+        if self.quantization_scale is None:
+            return value_sum
+        return value_sum * self.quantization_scale + count * self.quantization_offset
+
+    def calculate_cost_batch(self, matrix):
+        """
+        Calculates the costs of many texts at once.
+
+        Parameters:
+        - matrix (np.ndarray or list): Either a 2D array (candidates x length) of texts in number space,
+          or a list of texts with different lengths.
+
+        Returns:
+        - np.ndarray: A 1D float64 array with the cost of each text, equal to calling `calculate_cost` per text.
+
+        Notes:
+        - Texts of different lengths are padded with -1. Padding lies outside the alphabet, so every window
+          touching it is masked out, and each cost is averaged over the number of windows of its own text.
+        - Texts shorter than the gram size get a cost of 0.0.
+        """
+        if isinstance(matrix, np.ndarray) and matrix.ndim == 2:
+            texts = matrix
+            lengths = np.full(matrix.shape[0], matrix.shape[1], dtype=np.int64)
+        else:
+            rows = [np.asarray(row, dtype=np.int64) for row in matrix]
+            lengths = np.array([len(row) for row in rows], dtype=np.int64)
+            texts = np.full((len(rows), lengths.max(initial=0)), -1, dtype=np.int64)
+            for i, row in enumerate(rows):
+                texts[i, :len(row)] = row
+
+        indices, valid = self.flat_gram_indices(texts)
+        values = self.lookup(indices)
+        sums = np.where(valid, values, 0).sum(axis=1, dtype=np.float64)
+        sums = self.dequantize_sum(sums, valid.sum(axis=1))
+
+        ends = lengths - self.gram_size() + 1
+        costs = np.zeros(len(lengths), dtype=np.float64)
+        has_windows = ends > 0
+        costs[has_windows] = sums[has_windows] / ends[has_windows]
+        return costs
+
+    def calculate_cost_of_chunks(self, chunks):
+        """
+        Calculates the cost of a text that is given as a stream of overlapping chunks.
+
+        Parameters:
+        - chunks (iterable): Texts in number space, where each chunk starts with the last gram size - 1 symbols
+          of the previous one, e.g. as yielded by `LanguageStatistics.iterate_text_into_number_space` with
+          `overlap=gram_size() - 1`.
+
+        Returns:
+        - float: The cost of the concatenated text, equal to `calculate_cost` of that text.
+
+        Notes:
+        - Every n-gram window lies in exactly one chunk, so the sums of the chunks add up to the sum of the whole text.
+        """
+        value_sum = 0.0
+        windows = 0
+        for chunk in chunks:
+            value_sum += self.sum_of_costs(chunk)
+            windows += max(len(chunk) - self.gram_size() + 1, 0)
+        if windows == 0:
+            return 0.0
+        return value_sum / windows
+
+    def quantize(self, dtype):
+        """
+        Converts the frequencies into a compact storage type to save memory.
+
+        Parameters:
+        - dtype (str or np.dtype): The storage type: 'float16', 'uint16' or 'uint8'.
+
+        Raises:
+        - ValueError: If the storage type is not supported.
+        - Exception: If the frequencies have already been quantized.
+
+        Notes:
+        - 'float16' halves the memory and keeps about three significant digits. Tables with values beyond the
+          float16 range are stored divided by `quantization_scale`.
+        - 'uint16' and 'uint8' store each value as one of 65536 or 256 equally spaced bins between the smallest
+          and the largest finite value (`quantization_offset` + bin * `quantization_scale`), using a half or a
+          quarter of the memory of float32.
+        - Infinite values are clamped to the smallest or largest finite value.
+        - All scoring methods read the compact table directly. Quantize after normalizing, since normalization
+          is not possible anymore afterwards.
+        - The conversion works chunk by chunk, so no temporary full-size float array is allocated.
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in (np.float16, np.uint16, np.uint8):
+            raise ValueError(f"Unsupported quantization type: {dtype}")
+        if self.frequencies.dtype != np.float32:
+            raise Exception("This Gram object has already been quantized!")
+
+        source = self.frequencies.ravel()
+        chunk_size = 1 << 20
+        quantized = np.empty(self.frequencies.shape, dtype=dtype)
+        target = quantized.ravel()
+
+        minimum, maximum = np.inf, -np.inf
+        for start in range(0, source.size, chunk_size):
+            chunk = source[start:start + chunk_size]
+            chunk = chunk[np.isfinite(chunk)]
+            if chunk.size > 0:
+                minimum = min(minimum, float(chunk.min()))
+                maximum = max(maximum, float(chunk.max()))
+        if minimum > maximum:
+            minimum = maximum = 0.0
+
+        if dtype == np.float16:
+            # float16 only reaches 65504, so larger tables are scaled down (with some headroom).
+            largest = max(abs(minimum), abs(maximum))
+            scale = largest / 32768.0 if largest > 32768.0 else None
+            for start in range(0, source.size, chunk_size):
+                chunk = np.clip(source[start:start + chunk_size], minimum, maximum)
+                target[start:start + chunk_size] = chunk / scale if scale is not None else chunk
+            self.quantization_scale = scale
+            self.quantization_offset = 0.0
+        else:
+            levels = np.iinfo(dtype).max
+            scale = (maximum - minimum) / levels if maximum > minimum else 1.0
+            for start in range(0, source.size, chunk_size):
+                chunk = np.clip(source[start:start + chunk_size], minimum, maximum)
+                target[start:start + chunk_size] = np.rint((chunk - minimum) / scale)
+            self.quantization_scale = scale
+            self.quantization_offset = minimum
+
+        self.frequencies = quantized
+
+    def quantization_report(self, reference, texts):
+        """
+        Compares the costs of this (quantized) grams object with those of a float32 reference.
+
+        Parameters:
+        - reference (Grams): A grams object with the same statistics, stored as float32.
+        - texts (list or np.ndarray): Sample texts in number space, e.g. typical candidate decryptions.
+
+        Returns:
+        - dict: The comparison with the keys
+          - "memory_bytes" / "reference_memory_bytes": The size of both frequency tables.
+          - "max_table_error": The largest absolute difference between the dequantized and the reference table.
+          - "max_cost_error" / "mean_cost_error": The largest and mean absolute difference of the text costs.
+          - "rank_correlation": The Spearman rank correlation of the text costs (1.0 means the same ranking).
+          - "discordant_pairs": The fraction of text pairs ranked in a different order.
+          - "same_best": Whether both tables rank the same text best (lowest cost).
+        """
+        costs = self.calculate_cost_batch(texts)
+        reference_costs = reference.calculate_cost_batch(texts)
+
+        max_table_error = 0.0
+        source = reference.frequencies.ravel()
+        target = self.frequencies.ravel()
+        chunk_size = 1 << 20
+        for start in range(0, source.size, chunk_size):
+            chunk = target[start:start + chunk_size].astype(np.float64)
+            if self.quantization_scale is not None:
+                chunk = chunk * self.quantization_scale + self.quantization_offset
+            difference = np.abs(chunk - source[start:start + chunk_size])
+            difference = difference[np.isfinite(difference)]
+            if difference.size > 0:
+                max_table_error = max(max_table_error, float(difference.max()))
+
+        errors = np.abs(costs - reference_costs)
+        if len(costs) > 1:
+            ranks = np.argsort(np.argsort(costs))
+            reference_ranks = np.argsort(np.argsort(reference_costs))
+            rank_correlation = float(np.corrcoef(ranks, reference_ranks)[0, 1])
+            order = np.sign(costs[:, None] - costs[None, :])
+            reference_order = np.sign(reference_costs[:, None] - reference_costs[None, :])
+            discordant_pairs = float(np.sum(order != reference_order)) / (len(costs) * (len(costs) - 1))
+        else:
+            rank_correlation = 1.0
+            discordant_pairs = 0.0
+
+        return {
+            "memory_bytes": self.frequencies.nbytes,
+            "reference_memory_bytes": reference.frequencies.nbytes,
+            "max_table_error": max_table_error,
+            "max_cost_error": float(errors.max()) if errors.size > 0 else 0.0,
+            "mean_cost_error": float(errors.mean()) if errors.size > 0 else 0.0,
+            "rank_correlation": rank_correlation,
+            "discordant_pairs": discordant_pairs,
+            "same_best": bool(len(costs) == 0 or np.argmin(costs) == np.argmin(reference_costs)),
+        }
+
+    def load_normalized(self, max_value):
+        """
+        Normalizes the n-gram frequencies, using a cached normalized table if caching is enabled.
+
+        Parameters:
+        - max_value (float): The maximum value for normalization.
+
+        Notes:
+        - Without `self.use_cache`, this is the same as calling `normalize`.
+        - With `self.use_cache`, a valid normalized cache file is memory-mapped instead of normalizing.
+          Otherwise, the table is normalized and written into a normalized cache file for the next load.
+        """
+        if self.use_cache and self.load_cached_normalized(max_value):
+            return
+
+        self.normalize(max_value)
+
+        if self.use_cache:
+            language_statistics_file = LanguageStatisticsFile(self.file_path)
+            language_statistics_file.language_code = self.language
+            language_statistics_file.alphabet = self.alphabet
+            if language_statistics_file.write_cached_frequencies(self.frequencies, self.max_value, max_value):
+                self.frequencies = language_statistics_file.load_cached_frequencies(self.gram_size(), max_value)
+
+    def load_cached_normalized(self, max_value):
+        """
+        Opens the normalized cache file of the statistics file instead of normalizing, if it is valid.
+
+        Parameters:
+        - max_value (float): The maximum value for normalization.
+
+        Returns:
+        - bool: True if the normalized table was loaded from the cache file, False if there is no valid one.
+
+        Raises:
+        - Exception: If the frequencies have already been normalized.
+        """
+        language_statistics_file = LanguageStatisticsFile(self.file_path)
+        frequencies = language_statistics_file.load_cached_frequencies(self.gram_size(), max_value)
+        if frequencies is None:
+            return False
+        if self.is_normalized:
+            raise Exception("This Gram object has already been normalized!")
+        self.frequencies = frequencies
+        self.alphabet = language_statistics_file.alphabet
+        self.max_value = language_statistics_file.max_value
+        self.is_normalized = True
+        return True
+
     def normalize(self, max_value):
         """
         Normalizes the n-gram frequencies to a specified maximum value.
@@ -127,8 +645,22 @@ class Grams(ABC):
         - Exception: If the frequencies have already been normalized.
 
         Notes:
-        - Sets `self.is_normalized` to True after normalization.
+        - Adjusts all frequencies proportionally to the new maximum value, using whole-array NumPy arithmetic.
+        - Sets `self.is_normalized` to True and updates `self.max_value` to the new maximum after normalization.
+        - A read-only (memory-mapped) table is copied into memory first, since normalization works in place.
+        - Quantized frequencies cannot be normalized; normalize first, then quantize.
+        - A lazy grams object is loaded first.
         """
+        self.materialize()
         if self.is_normalized:
             raise Exception("This Gram object has already been normalized!")
-        self.is_normalized = True
\ No newline at end of file
+        if self.frequencies.dtype != np.float32:
+            raise Exception("A quantized Gram object cannot be normalized!")
+        if not self.frequencies.flags.writeable:
+            self.frequencies = np.array(self.frequencies)
+        self.is_normalized = True
+        adjust_value = self.max_value * max_value
+        # Divide in place on a view of the table, so no second full-size array is allocated.
+        frequencies = self.frequencies[(slice(len(self.alphabet)),) * self.gram_size()]
+        np.divide(adjust_value, frequencies, out=frequencies)
+        self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
\ No newline at end of file
@@ -0,0 +1,220 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from languagestatisticslibpy.GramsType import GramsType
+from languagestatisticslibpy.Unigrams import Unigrams
+from languagestatisticslibpy.Bigrams import Bigrams
+from languagestatisticslibpy.Trigrams import Trigrams
+from languagestatisticslibpy.Tetragrams import Tetragrams
+from languagestatisticslibpy.Pentagrams import Pentagrams
+from languagestatisticslibpy.Hexagrams import Hexagrams
+from languagestatisticslibpy.SparseGrams import SparseGrams
+
+class GramsRegistry:
+    """
+    Thread-safe registry that shares loaded grams objects and evicts the least recently used ones.
+
+    Grams objects are keyed by (language statistics directory, language, grams type, use_spaces,
+    normalization value, sparse). Asking twice for the same key returns the same instance, and concurrent
+    requests for a key that is currently loading wait for that single load.
+
+    Attributes:
+    - grams_classes (dict): Maps each GramsType to the class implementing it.
+    - memory_budget (int or None): The maximum number of bytes of all stored frequency tables, or None for no limit.
+    - use_cache (bool): Whether grams are loaded using memory-mapped cache files (not used for SparseGrams).
+    - hits (int): Number of requests answered by an already loaded (or currently loading) grams object.
+    - misses (int): Number of requests that had to load a grams object.
+    - evictions (int): Number of grams objects dropped to stay within the memory budget.
+    - memory_usage (int): Number of bytes of all stored frequency tables.
+
+    Notes:
+    - The returned grams objects are shared, so they must not be modified (e.g. normalized) by the caller.
+      Use the `normalize_to` parameter of `get` to obtain normalized grams instead.
+    - An evicted grams object stays usable by everyone still holding a reference to it.
+    """
+
+    grams_classes = {
+        GramsType.Unigrams: Unigrams,
+        GramsType.Bigrams: Bigrams,
+        GramsType.Trigrams: Trigrams,
+        GramsType.Tetragrams: Tetragrams,
+        GramsType.Pentagrams: Pentagrams,
+        GramsType.Hexagrams: Hexagrams,
+    }
+
+    def __init__(self, memory_budget=None, use_cache=False):
+        """
+        Initializes an empty registry.
+
+        Parameters:
+        - memory_budget (int or None): The maximum number of bytes of all stored frequency tables (default: None, no limit).
+        - use_cache (bool): Whether grams are loaded using memory-mapped cache files (default: False).
+        """
+        self.memory_budget = memory_budget
+        self.use_cache = use_cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory_usage = 0
+        self.entries = OrderedDict()
+        self.loading = {}
+        self.lock = threading.Lock()
+
+    def get(self, language, language_statistics_directory, grams_type, use_spaces=False, normalize_to=None, sparse=False):
+        """
+        Returns the shared grams object for the given parameters, loading it if necessary.
+
+        Parameters:
+        - language (str): The language code.
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - grams_type (GramsType): The type of grams.
+        - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - normalize_to (float or None): If given, the grams are normalized to this value (default: None).
+        - sparse (bool): Whether to load SparseGrams, which only store the observed n-grams (default: False).
+
+        Returns:
+        - Grams: The shared grams object.
+
+        Raises:
+        - ValueError: If the grams type is unsupported.
+        - Exception: If loading fails; every request waiting for the same load gets the same exception.
+        """
+        if grams_type not in self.grams_classes:
+            raise ValueError(f"Unsupported grams type: {grams_type}")
+        key = (os.path.abspath(language_statistics_directory), language, grams_type, use_spaces, normalize_to, sparse)
+
+        with self.lock:
+            grams = self.entries.get(key)
+            if grams is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return grams
+            future = self.loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                future = Future()
+                self.loading[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            if sparse:
+                grams = SparseGrams(language, language_statistics_directory, use_spaces, gram_size=grams_type.value,
+                                    normalize_to=normalize_to)
+            else:
+                grams = self.grams_classes[grams_type](language, language_statistics_directory, use_spaces,
+                                                       self.use_cache, normalize_to)
+        except BaseException as e:
+            with self.lock:
+                del self.loading[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.loading[key]
+            self.entries[key] = grams
+            self.memory_usage += grams.table_bytes()
+            self.evict(keep=key)
+        future.set_result(grams)
+        return grams
+
+    def get_by_size(self, grams_size, language, language_statistics_directory, use_spaces=False, normalize_to=None, sparse=False):
+        """
+        Returns the shared grams object for the given gram size (e.g., 1 for unigrams, 2 for bigrams).
+
+        Parameters:
+        - grams_size (int): The size of the grams.
+        - language (str): The language code.
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - normalize_to (float or None): If given, the grams are normalized to this value (default: None).
+        - sparse (bool): Whether to load SparseGrams, which only store the observed n-grams (default: False).
+
+        Returns:
+        - Grams: The shared grams object.
+
+        Raises:
+        - ValueError: If the grams size is not supported.
+        """
+        try:
+            grams_type = GramsType(grams_size)
+        except ValueError:
+            raise ValueError(f"No GramsType found for length: {grams_size}")
+        return self.get(language, language_statistics_directory, grams_type, use_spaces, normalize_to, sparse)
+
+    def evict(self, keep=None):
+        """
+        Drops least recently used grams objects until the memory budget is met.
+
+        Parameters:
+        - keep (tuple or None): A key that must not be evicted (e.g., the one that was just loaded).
+
+        Notes:
+        - Must be called while holding `self.lock`.
+        - A single table larger than the budget is kept, so the registry never fails to return it.
+        """
+        if self.memory_budget is None:
+            return
+        for key in list(self.entries):
+            if self.memory_usage <= self.memory_budget:
+                break
+            if key == keep:
+                continue
+            grams = self.entries.pop(key)
+            self.memory_usage -= grams.table_bytes()
+            self.evictions += 1
+
+    def set_memory_budget(self, memory_budget):
+        """
+        Changes the memory budget and evicts grams objects if necessary.
+
+        Parameters:
+        - memory_budget (int or None): The maximum number of bytes of all stored frequency tables, or None for no limit.
+        """
+        with self.lock:
+            self.memory_budget = memory_budget
+            self.evict()
+
+    def clear(self):
+        """
+        Drops all stored grams objects. The counters are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.memory_usage = 0
+
+    def statistics(self):
+        """
+        Returns the counters of the registry.
+
+        Returns:
+        - dict: The number of hits, misses, evictions, stored entries and the memory usage in bytes.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "memory_usage": self.memory_usage,
+            }
@@ -20,7 +20,7 @@ from languagestatisticslibpy.GramsType import GramsType
 from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
 
 class Hexagrams(Grams):
-    def __init__(self, language, language_statistics_directory, use_spaces=False):
+    def __init__(self, language, language_statistics_directory, use_spaces=False, use_cache=False, normalize_to=None, lazy=False, progress_callback=None):
         """
         Initializes the Hexagrams class by calling the parent class (Grams) initializer.
 
@@ -28,16 +28,23 @@ class Hexagrams(Grams):
         - language (str): The language of the hexagram statistics.
         - language_statistics_directory (str): Path to the directory containing language statistics files.
         - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - lazy (bool): If True, only the file header is read now and the frequencies are loaded on first use (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
         """
-        super().__init__(language, language_statistics_directory, use_spaces)
+        super().__init__(language, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
 
-    def load_gz(self, filename, language_statistics_directory):
+    def load_gz(self, filename, language_statistics_directory, progress_callback=None):
         """
         Loads a gzip-compressed file containing hexagram frequencies.
 
         Parameters:
         - filename (str): The name of the file to load.
         - language_statistics_directory (str): The directory where the statistics file is located.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each
+          chunk of frequency data read from the .gz file (default: None).
 
         Sets:
         - self.frequencies (np.ndarray): A 6D array of hexagram frequencies.
@@ -46,7 +53,7 @@ class Hexagrams(Grams):
         """
         file_path = os.path.join(language_statistics_directory, filename)
         language_statistics_file = LanguageStatisticsFile(file_path)
-        self.frequencies = language_statistics_file.load_frequencies(6)
+        self.frequencies = language_statistics_file.load_frequencies(6, self.cache_raw_frequencies, progress_callback)
         self.alphabet = language_statistics_file.alphabet
         self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
 
@@ -55,39 +62,21 @@ class Hexagrams(Grams):
         Calculates the cost of a given text based on hexagram frequencies.
 
         Parameters:
-        - text (str): The text to analyze.
+        - text (list or np.ndarray): The text to analyze, mapped into number space.
 
         Returns:
         - float: The average cost of hexagrams in the text. Returns 0.0 if the text length is less than 6.
 
         Notes:
+        - The text may be a list or a NumPy array of symbol indices; all windows are scored in one vectorized pass.
         - Skips hexagrams containing characters outside the defined alphabet.
         - If `add_letter_indices` is defined, modifies the index of the characters before computing the cost.
         """
         if len(text) < 6:
             return 0.0
 
-        value = 0.0
-        alphabet_length = len(self.alphabet)
         end = len(text) - 5
-
-        for i in range(end):
-            a, b, c, d, e, f = text[i:i+6]
-
-            if self.add_letter_indices:
-                a += self.add_letter_indices.get(a, 0)
-                b += self.add_letter_indices.get(b, 0)
-                c += self.add_letter_indices.get(c, 0)
-                d += self.add_letter_indices.get(d, 0)
-                e += self.add_letter_indices.get(e, 0)
-                f += self.add_letter_indices.get(f, 0)
-
-            if 0 <= a < alphabet_length and 0 <= b < alphabet_length and \
-               0 <= c < alphabet_length and 0 <= d < alphabet_length and \
-               0 <= e < alphabet_length and 0 <= f < alphabet_length:
-                value += self.frequencies[a, b, c, d, e, f]
-
-        return value / end
+        return self.sum_of_costs(text) / end
 
     def gram_size(self):
         """
@@ -106,25 +95,3 @@ class Hexagrams(Grams):
         - GramsType: An enum value representing the type of grams (GramsType.Hexagrams).
         """
         return GramsType.Hexagrams
-
-    def normalize(self, max_value):
-        """
-        Normalizes the hexagram frequencies based on the provided maximum value.
-
-        Parameters:
-        - max_value (float): The maximum value used for normalization.
-
-        Notes:
-        - Adjusts all frequencies proportionally to the new maximum value.
-        - Updates `self.max_value` to the new maximum after normalization.
-        """
-        super().normalize(max_value)
-        adjust_value = self.max_value * max_value
-        for a in range(len(self.alphabet)):
-            for b in range(len(self.alphabet)):
-                for c in range(len(self.alphabet)):
-                    for d in range(len(self.alphabet)):
-                        for e in range(len(self.alphabet)):
-                            for f in range(len(self.alphabet)):
-                                self.frequencies[a, b, c, d, e, f] = adjust_value / self.frequencies[a, b, c, d, e, f]
-        self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
@@ -0,0 +1,223 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import numpy as np
+
+class IncrementalCost:
+    """
+    Stateful scorer that evaluates small edits of a text without rescanning the whole text.
+
+    A change of a single position only affects the (at most) n windows of an n-gram that cover
+    this position. The scorer keeps the sum of all window costs of the current text and only
+    re-reads the affected windows when an edit is proposed.
+
+    Usage:
+    - Propose an edit with `delta_set` or `delta_swap`; both return the cost change.
+    - Accept the proposed edit with `commit` or discard it with `rollback`.
+
+    Attributes:
+    - grams (Grams): The n-gram object used for scoring.
+    - gram_size (int): The size of the grams (taken from `grams.gram_size()`).
+    - end (int): The number of n-gram windows of the text.
+    - total (float): The sum of the costs of all windows of the committed text.
+    """
+
+    def __init__(self, grams, text):
+        """
+        Initializes the scorer with a grams object and a starting text.
+
+        Parameters:
+        - grams (Grams): The n-gram object used for scoring.
+        - text (list or np.ndarray): The starting text in number space.
+        """
+        self.grams = grams
+        self.gram_size = grams.gram_size()
+        self.alphabet_length = len(grams.alphabet)
+        self.base = grams.table_dimension()
+        self.lookup_value = grams.lookup_value
+        self.quantization_scale = grams.quantization_scale
+        self.quantization_offset = grams.quantization_offset
+        self.add_letter_indices = list(grams.add_letter_indices) if grams.add_letter_indices else None
+
+        self.raw_symbols = [int(symbol) for symbol in text]
+        self.symbols = grams.map_symbols(self.raw_symbols).tolist()
+        self.end = max(len(self.symbols) - self.gram_size + 1, 0)
+        self.total = grams.sum_of_costs(self.raw_symbols)
+        self.pending = None
+
+    @property
+    def text(self):
+        """
+        Returns the committed text.
+
+        Returns:
+        - np.ndarray: The committed text in number space.
+        """
+        return np.array(self.raw_symbols, dtype=np.int64)
+
+    @property
+    def cost(self):
+        """
+        Returns the cost of the committed text.
+
+        Returns:
+        - float: The same value `grams.calculate_cost(text)` returns for the committed text.
+        """
+        if self.end == 0:
+            return 0.0
+        return self.total / self.end
+
+    def adjust(self, symbol):
+        """
+        Applies the `add_letter_indices` adjustment of the grams object to a single symbol.
+
+        Parameters:
+        - symbol (int): The symbol to adjust.
+
+        Returns:
+        - int: The adjusted symbol, as used for the n-gram lookup.
+        """
+        symbol = int(symbol)
+        if self.add_letter_indices and 0 <= symbol < len(self.add_letter_indices):
+            symbol += self.add_letter_indices[symbol]
+        return symbol
+
+    def window_cost(self, start):
+        """
+        Returns the cost of the window starting at the given position of the current symbols.
+
+        Parameters:
+        - start (int): The first position of the window.
+
+        Returns:
+        - float: The frequency of the n-gram, or 0.0 if it contains a symbol outside the alphabet.
+        """
+        index = 0
+        for symbol in self.symbols[start:start + self.gram_size]:
+            if not 0 <= symbol < self.alphabet_length:
+                return 0.0
+            index = index * self.base + symbol
+        value = self.lookup_value(index)
+        if self.quantization_scale is not None:
+            return value * self.quantization_scale + self.quantization_offset
+        return value
+
+    def affected_windows(self, positions):
+        """
+        Returns the start positions of all windows that cover at least one of the given positions.
+
+        Parameters:
+        - positions (iterable): Positions in the text.
+
+        Returns:
+        - list: The sorted start positions of the affected windows (each window only once).
+        """
+        starts = set()
+        for position in positions:
+            first = max(position - self.gram_size + 1, 0)
+            last = min(position, self.end - 1)
+            starts.update(range(first, last + 1))
+        return sorted(starts)
+
+    def delta(self, changes):
+        """
+        Proposes a set of changes and returns the resulting cost change.
+
+        Parameters:
+        - changes (dict): Maps positions to their new (unadjusted) symbols.
+
+        Returns:
+        - float: The cost change the proposed changes would cause.
+
+        Notes:
+        - The proposal is always relative to the committed text and replaces any earlier proposal.
+        """
+        for position in changes:
+            if not 0 <= position < len(self.symbols):
+                raise IndexError(f"Position {position} is outside of the text of length {len(self.symbols)}")
+
+        starts = self.affected_windows(changes)
+        old_symbols = {position: self.symbols[position] for position in changes}
+        new_symbols = {position: self.adjust(symbol) for position, symbol in changes.items()}
+
+        old_value = sum(self.window_cost(start) for start in starts)
+        for position, symbol in new_symbols.items():
+            self.symbols[position] = symbol
+        new_value = sum(self.window_cost(start) for start in starts)
+        for position, symbol in old_symbols.items():
+            self.symbols[position] = symbol
+
+        delta_total = new_value - old_value
+        self.pending = ({position: int(symbol) for position, symbol in changes.items()}, new_symbols, delta_total)
+        return delta_total / self.end if self.end > 0 else 0.0
+
+    def delta_set(self, pos, symbol):
+        """
+        Proposes to set the symbol at a position and returns the resulting cost change.
+
+        Parameters:
+        - pos (int): The position to change.
+        - symbol (int): The new symbol.
+
+        Returns:
+        - float: The cost change the edit would cause.
+        """
+        return self.delta({pos: symbol})
+
+    def delta_swap(self, i, j):
+        """
+        Proposes to swap the symbols at two positions and returns the resulting cost change.
+
+        Parameters:
+        - i (int): The first position.
+        - j (int): The second position.
+
+        Returns:
+        - float: The cost change the swap would cause.
+        """
+        return self.delta({i: self.raw_symbols[j], j: self.raw_symbols[i]})
+
+    def commit(self):
+        """
+        Applies the pending proposal to the text.
+
+        Raises:
+        - Exception: If there is no pending proposal.
+        """
+        if self.pending is None:
+            raise Exception("There is no pending change to commit!")
+        raw_changes, new_symbols, delta_total = self.pending
+        for position, symbol in raw_changes.items():
+            self.raw_symbols[position] = symbol
+        for position, symbol in new_symbols.items():
+            self.symbols[position] = symbol
+        self.total += delta_total
+        self.pending = None
+
+    def rollback(self):
+        """
+        Discards the pending proposal, if any.
+        """
+        self.pending = None
+
+    def recalculate(self):
+        """
+        Recomputes the sum of all window costs from scratch.
+
+        Notes:
+        - Committing many deltas accumulates floating point rounding errors; calling this now and then
+          resets the sum to the exact value.
+        """
+        self.total = self.grams.sum_of_costs(self.raw_symbols)
@@ -0,0 +1,118 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+
+class IncrementalIoc:
+    """
+    Accumulator for the Index of Coincidence (IoC) that is updated in O(1) per symbol.
+
+    The IoC only depends on the sum of count * (count - 1) over all symbols. Adding a symbol with count c
+    increases this sum by 2c, removing one decreases it by 2(c - 1), so the sum never has to be recomputed.
+
+    Attributes:
+    - counts (dict): The number of occurrences of each symbol.
+    - length (int): The number of symbols.
+    - coincidences (int): The sum of count * (count - 1) over all symbols.
+    """
+
+    def __init__(self, text=()):
+        """
+        Initializes the accumulator with the symbols of a text.
+
+        Parameters:
+        - text (iterable): The starting symbols, e.g. a text or a text in number space (default: empty).
+        """
+        self.counts = {}
+        self.length = 0
+        self.coincidences = 0
+        for symbol in text:
+            self.add(symbol)
+
+    @property
+    def ioc(self):
+        """
+        Returns the IoC of the current symbols.
+
+        Returns:
+        - float: The same value `LanguageStatistics.calculate_ioc` returns for the current symbols.
+        """
+        if self.length <= 1:
+            return 0
+        return self.coincidences / (self.length * (self.length - 1))
+
+    def add(self, symbol):
+        """
+        Adds one occurrence of a symbol.
+
+        Parameters:
+        - symbol (hashable): The symbol to add.
+        """
+        count = self.counts.get(symbol, 0)
+        self.coincidences += 2 * count
+        self.counts[symbol] = count + 1
+        self.length += 1
+
+    def remove(self, symbol):
+        """
+        Removes one occurrence of a symbol.
+
+        Parameters:
+        - symbol (hashable): The symbol to remove.
+
+        Raises:
+        - Exception: If the symbol does not occur.
+        """
+        count = self.counts.get(symbol, 0)
+        if count == 0:
+            raise Exception(f"Cannot remove symbol {symbol!r}: it does not occur!")
+        count -= 1
+        self.coincidences -= 2 * count
+        if count == 0:
+            del self.counts[symbol]
+        else:
+            self.counts[symbol] = count
+        self.length -= 1
+
+    def swap(self, old_symbol, new_symbol):
+        """
+        Replaces one occurrence of a symbol by another symbol.
+
+        Parameters:
+        - old_symbol (hashable): The symbol to remove.
+        - new_symbol (hashable): The symbol to add.
+        """
+        if old_symbol == new_symbol:
+            return
+        self.remove(old_symbol)
+        self.add(new_symbol)
+
+    def delta_swap(self, old_symbol, new_symbol):
+        """
+        Returns the IoC change that replacing one occurrence of a symbol would cause, without applying it.
+
+        Parameters:
+        - old_symbol (hashable): The symbol that would be removed.
+        - new_symbol (hashable): The symbol that would be added.
+
+        Returns:
+        - float: The IoC change.
+        """
+        if old_symbol == new_symbol or self.length <= 1:
+            return 0.0
+        old_count = self.counts.get(old_symbol, 0)
+        if old_count == 0:
+            raise Exception(f"Cannot remove symbol {old_symbol!r}: it does not occur!")
+        new_count = self.counts.get(new_symbol, 0)
+        return (2 * new_count - 2 * (old_count - 1)) / (self.length * (self.length - 1))
@@ -15,7 +15,11 @@
 '''
 import os
 import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import numpy as np
 from languagestatisticslibpy.GramsType import GramsType
 from languagestatisticslibpy.Unigrams import Unigrams
 from languagestatisticslibpy.Bigrams import Bigrams
@@ -23,7 +27,14 @@ from languagestatisticslibpy.Trigrams import Trigrams
 from languagestatisticslibpy.Tetragrams import Tetragrams
 from languagestatisticslibpy.Pentagrams import Pentagrams
 from languagestatisticslibpy.Hexagrams import Hexagrams
+from languagestatisticslibpy.SparseGrams import SparseGrams
 from languagestatisticslibpy.WordTree import WordTree
+from languagestatisticslibpy.CompactWordTree import CompactWordTree
+from languagestatisticslibpy.AhoCorasick import AhoCorasick
+from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
+from languagestatisticslibpy.GramsRegistry import GramsRegistry
+from languagestatisticslibpy.LanguageStatisticsIndex import LanguageStatisticsIndex
+from languagestatisticslibpy.SymbolMapper import SymbolMapper
 
 class HandlingOfUnknownSymbols(Enum):
     """
@@ -47,6 +58,7 @@ class LanguageStatistics:
     - supported_languages (list): A list of language names corresponding to the supported language codes.
     - unigrams (dict): A dictionary mapping language codes to their unigram frequencies.
     - alphabets (dict): A dictionary mapping language codes to their alphabets.
+    - grams_registry (GramsRegistry): The process-wide registry of shared grams objects used by `get_grams`.
     """
 
     supported_languages_codes = [
@@ -100,6 +112,8 @@ class LanguageStatistics:
         "tr": "ABCÇDEFGĞHIİJKLMNOÖPRSŞTUÜVYZ", # Turkish
     }
 
+    grams_registry = GramsRegistry()
+
     @staticmethod
     def language_code(language_id):
         """
@@ -130,7 +144,8 @@ class LanguageStatistics:
         return LanguageStatistics.supported_languages_codes.index(language_code.lower())
 
     @staticmethod
-    def create_grams(language_code, language_statistics_directory, grams_type, use_spaces):
+    def create_grams(language_code, language_statistics_directory, grams_type, use_spaces, use_cache=False, normalize_to=None, lazy=False, sparse=False,
+                     progress_callback=None):
         """
         Creates a grams object of the specified type.
 
@@ -139,30 +154,45 @@ class LanguageStatistics:
         - language_statistics_directory (str): Path to the language statistics directory.
         - grams_type (GramsType): The type of grams to create.
         - use_spaces (bool): Whether to include spaces in the analysis.
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - lazy (bool): If True, only the file header is read now and the frequencies are loaded on first use (default: False).
+        - sparse (bool): If True, a SparseGrams object is created, which only stores the observed n-grams instead of a
+          dense table; it supports neither `use_cache` nor `lazy` (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
 
         Returns:
         - Grams: The created grams object.
 
         Raises:
-        - ValueError: If the grams type is unsupported.
+        - ValueError: If the grams type is unsupported, or if `sparse` is combined with `use_cache` or `lazy`.
         """
+        if sparse:
+            if grams_type == GramsType.Undefined or not isinstance(grams_type, GramsType):
+                raise ValueError(f"Unsupported grams type: {grams_type}")
+            if use_cache or lazy:
+                raise ValueError("SparseGrams support neither use_cache nor lazy loading")
+            return SparseGrams(language_code, language_statistics_directory, use_spaces, gram_size=grams_type.value,
+                               normalize_to=normalize_to, progress_callback=progress_callback)
         if grams_type == GramsType.Unigrams:
-            return Unigrams(language_code, language_statistics_directory, use_spaces)
+            return Unigrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         elif grams_type == GramsType.Bigrams:
-            return Bigrams(language_code, language_statistics_directory, use_spaces)
+            return Bigrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         elif grams_type == GramsType.Trigrams:
-            return Trigrams(language_code, language_statistics_directory, use_spaces)
+            return Trigrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         elif grams_type == GramsType.Tetragrams:
-            return Tetragrams(language_code, language_statistics_directory, use_spaces)
+            return Tetragrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         elif grams_type == GramsType.Pentagrams:
-            return Pentagrams(language_code, language_statistics_directory, use_spaces)
+            return Pentagrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         elif grams_type == GramsType.Hexagrams:
-            return Hexagrams(language_code, language_statistics_directory, use_spaces)
+            return Hexagrams(language_code, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
         else:
             raise ValueError(f"Unsupported grams type: {grams_type}")
 
     @staticmethod
-    def create_grams_by_size(grams_size, language, language_statistics_directory, use_spaces=False):
+    def create_grams_by_size(grams_size, language, language_statistics_directory, use_spaces=False, use_cache=False, normalize_to=None, lazy=False, sparse=False,
+                             progress_callback=None):
         """
         Creates a grams object for the specified size (e.g., unigrams, bigrams, etc.).
 
@@ -171,15 +201,116 @@ class LanguageStatistics:
         - language (str): The language code.
         - language_statistics_directory (str): Path to the language statistics directory.
         - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - lazy (bool): If True, only the file header is read now and the frequencies are loaded on first use (default: False).
+        - sparse (bool): If True, a SparseGrams object is created (see `create_grams`) (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
 
         Returns:
         - Grams: The created grams object of the specified size.
 
         Raises:
-        - ValueError: If the grams size is not supported.
+        - ValueError: If the grams size is not supported, or if `sparse` is combined with `use_cache` or `lazy`.
         """
         grams_type = LanguageStatistics.get_grams_type_by_length(grams_size)
-        return LanguageStatistics.create_grams(language, language_statistics_directory, grams_type, use_spaces)
+        return LanguageStatistics.create_grams(language, language_statistics_directory, grams_type, use_spaces, use_cache, normalize_to, lazy, sparse,
+                                               progress_callback)
+
+    @staticmethod
+    def get_grams(language_code, language_statistics_directory, grams_type, use_spaces=False, normalize_to=None, sparse=False):
+        """
+        Returns a shared grams object of the specified type from the process-wide grams registry.
+
+        Parameters:
+        - language_code (str): The language code.
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - grams_type (GramsType): The type of grams.
+        - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - normalize_to (float or None): If given, the grams are normalized to this value (default: None).
+        - sparse (bool): Whether to use SparseGrams, which only store the observed n-grams (default: False).
+
+        Returns:
+        - Grams: The shared grams object. It is only loaded if it is not already in the registry.
+
+        Notes:
+        - The returned object is shared with other callers and must not be normalized or otherwise modified.
+        - The memory budget of the registry can be set with `LanguageStatistics.grams_registry.set_memory_budget`.
+        """
+        return LanguageStatistics.grams_registry.get(language_code, language_statistics_directory, grams_type, use_spaces, normalize_to, sparse)
+
+    @staticmethod
+    def preload(specs, language_statistics_directory, max_workers=None, normalize_to=None, memory_budget=None, use_cache=False,
+                progress_callback=None):
+        """
+        Loads (and optionally normalizes) many grams objects concurrently using a thread pool.
+
+        Parameters:
+        - specs (iterable): Tuples (language_code, grams, use_spaces), where grams is a GramsType or a gram size.
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - max_workers (int or None): The number of loader threads (default: None, chosen by ThreadPoolExecutor).
+        - normalize_to (float or None): If given, all grams are normalized to this value (default: None).
+        - memory_budget (int or None): The maximum number of bytes of frequency tables being loaded at the same time.
+          A load waits until enough of the budget is free; a single table larger than the budget is loaded alone
+          (default: None, no limit).
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz files (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(spec, bytes_read, bytes_total)` while the
+          frequencies of a spec are read from its .gz file. It is called from the loader threads (default: None).
+
+        Returns:
+        - tuple: (grams, timings), two dicts keyed by spec with the loaded grams objects and the load durations
+          in seconds (including normalization, excluding time spent waiting for the memory budget).
+
+        Raises:
+        - Exception: The first error of a failed load, after all other loads have finished.
+
+        Notes:
+        - Gzip decompression and NumPy operations release the GIL, so the loads run in parallel.
+        - The expected table size of each file is taken from its header before loading it.
+        """
+        specs = list(dict.fromkeys(specs))
+        budget_condition = threading.Condition()
+        bytes_in_flight = [0]
+
+        def load(spec):
+            language_code, grams, use_spaces = spec
+            grams_type = grams if isinstance(grams, GramsType) else LanguageStatistics.get_grams_type_by_length(grams)
+            filename = f"{language_code}-{grams_type.value}gram-nocs{'-sp' if use_spaces else ''}.gz"
+            language_statistics_file = LanguageStatisticsFile(os.path.join(language_statistics_directory, filename))
+            try:
+                gram_length = language_statistics_file.load_header()
+                expected_bytes = language_statistics_file.alphabet_length ** gram_length * 4
+            except FileNotFoundError:
+                expected_bytes = 0
+
+            spec_progress_callback = None
+            if progress_callback is not None:
+                spec_progress_callback = lambda bytes_read, bytes_total: progress_callback(spec, bytes_read, bytes_total)
+
+            with budget_condition:
+                if memory_budget is not None:
+                    budget_condition.wait_for(lambda: bytes_in_flight[0] == 0 or bytes_in_flight[0] + expected_bytes <= memory_budget)
+                bytes_in_flight[0] += expected_bytes
+            try:
+                start = time.perf_counter()
+                loaded = LanguageStatistics.create_grams(language_code, language_statistics_directory, grams_type,
+                                                         use_spaces, use_cache, normalize_to,
+                                                         progress_callback=spec_progress_callback)
+                return loaded, time.perf_counter() - start
+            finally:
+                with budget_condition:
+                    bytes_in_flight[0] -= expected_bytes
+                    budget_condition.notify_all()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {spec: executor.submit(load, spec) for spec in specs}
+
+        grams = {}
+        timings = {}
+        for spec, future in futures.items():
+            grams[spec], timings[spec] = future.result()
+        return grams, timings
 
     @staticmethod
     def get_grams_type_by_length(length):
@@ -201,6 +332,21 @@ class LanguageStatistics:
             raise ValueError(f"No GramsType found for length: {length}")
 
 
+    @staticmethod
+    def scan_directory(language_statistics_directory, use_manifest=True):
+        """
+        Describes the language statistics files and dictionaries of a directory without decompressing them.
+
+        Parameters:
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - use_manifest (bool): Whether to cache the index in a JSON manifest inside the directory (default: True).
+
+        Returns:
+        - LanguageStatisticsIndex: The index with language code, gram length, space usage, alphabet, number of
+          entries and expected in-memory size of each statistics file, and the available dictionaries.
+        """
+        return LanguageStatisticsIndex.scan(language_statistics_directory, use_manifest)
+
     @staticmethod
     def alphabet(language, use_spaces=False):
         """
@@ -224,11 +370,16 @@ class LanguageStatistics:
         Calculates the Index of Coincidence (IoC) for a given plaintext.
 
         Parameters:
-        - plaintext (str): The input text.
+        - plaintext (str, list or np.ndarray): The input text, or the text in number space.
 
         Returns:
         - float: The IoC of the text.
+
+        Notes:
+        - Integer NumPy arrays are counted with `np.bincount` (see `calculate_ioc_of_numbers`).
         """
+        if isinstance(plaintext, np.ndarray) and plaintext.dtype.kind in 'iu':
+            return LanguageStatistics.calculate_ioc_of_numbers(plaintext)
         count_chars = {}
         for c in plaintext:
             count_chars[c] = count_chars.get(c, 0) + 1
@@ -238,34 +389,200 @@ class LanguageStatistics:
             return 0
         return value / (N * (N - 1))
 
+    @staticmethod
+    def calculate_ioc_of_numbers(numbers):
+        """
+        Calculates the Index of Coincidence (IoC) of a text in number space using `np.bincount`.
+
+        Parameters:
+        - numbers (list or np.ndarray): The text in number space.
+
+        Returns:
+        - float: The IoC of the text, equal to `calculate_ioc` of the same numbers.
+
+        Notes:
+        - Negative numbers (e.g., replaced unknown symbols) are counted as symbols of their own, like in `calculate_ioc`.
+        """
+        numbers = np.asarray(numbers, dtype=np.int64).ravel()
+        N = numbers.size
+        if N <= 1:
+            return 0
+        lowest = numbers.min()
+        counts = np.bincount(numbers - lowest if lowest < 0 else numbers).astype(np.int64)
+        return float(np.dot(counts, counts - 1)) / (N * (N - 1))
+
+    @staticmethod
+    def calculate_ioc_batch(matrix):
+        """
+        Calculates the Index of Coincidence (IoC) of every row of a 2-D matrix of texts in number space.
+
+        Parameters:
+        - matrix (np.ndarray): A 2-D integer array (candidates x length).
+
+        Returns:
+        - np.ndarray: A 1D float64 array with the IoC of each row, equal to calling `calculate_ioc` per row.
+
+        Notes:
+        - All rows are counted with a single `np.bincount` by giving every row its own range of bins.
+        """
+        matrix = np.asarray(matrix, dtype=np.int64)
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2-D matrix of numbers, got {matrix.ndim} dimension(s)")
+        rows, N = matrix.shape
+        if N <= 1 or rows == 0:
+            return np.zeros(rows, dtype=np.float64)
+        lowest = int(matrix.min())
+        bins = int(matrix.max()) - lowest + 1
+        offsets = np.arange(rows, dtype=np.int64)[:, None] * bins
+        counts = np.bincount((matrix - lowest + offsets).ravel(), minlength=rows * bins).reshape(rows, bins)
+        return (counts * (counts - 1)).sum(axis=1, dtype=np.float64) / (N * (N - 1))
+
+    @staticmethod
+    def calculate_periodic_ioc(numbers, max_period):
+        """
+        Calculates the mean column Index of Coincidence (IoC) of a text for every period from 1 to `max_period`.
+
+        For a period p, the text is split into the p columns text[0::p], ..., text[p-1::p], and the IoC values
+        of these columns are averaged. For a periodic polyalphabetic cipher (e.g. Vigenère), the mean column IoC
+        is close to the IoC of the plaintext language for the key length and its multiples.
+
+        Parameters:
+        - numbers (list or np.ndarray): The ciphertext in number space.
+        - max_period (int): The largest period to analyze.
+
+        Returns:
+        - np.ndarray: A float64 array of length `max_period`; entry p - 1 is the mean column IoC for period p.
+
+        Notes:
+        - Each period is counted with a single `np.bincount` over (column, symbol) pairs.
+        - Columns with fewer than two symbols have an IoC of 0, like in `calculate_ioc`.
+        """
+        numbers = np.asarray(numbers, dtype=np.int64).ravel()
+        N = numbers.size
+        result = np.zeros(max(max_period, 0), dtype=np.float64)
+        if N == 0:
+            return result
+        lowest = int(numbers.min())
+        symbols = numbers - lowest
+        bins = int(symbols.max()) + 1
+        positions = np.arange(N, dtype=np.int64)
+
+        for period in range(1, max_period + 1):
+            columns = positions % period
+            counts = np.bincount(columns * bins + symbols, minlength=period * bins).reshape(period, bins)
+            coincidences = (counts * (counts - 1)).sum(axis=1, dtype=np.float64)
+            lengths = (N - np.arange(period) + period - 1) // period
+            pairs = lengths * (lengths - 1)
+            column_iocs = np.divide(coincidences, pairs, out=np.zeros(period, dtype=np.float64), where=pairs > 0)
+            result[period - 1] = column_iocs.mean()
+        return result
+
+    @staticmethod
+    def calculate_kasiski_spacings(numbers, max_period, gram_length=3):
+        """
+        Finds repeated n-grams of a text and counts for every period how many of their spacings it divides (Kasiski test).
+
+        Parameters:
+        - numbers (list or np.ndarray): The ciphertext in number space.
+        - max_period (int): The largest period to analyze.
+        - gram_length (int): The length of the repeated n-grams to look for (default: 3).
+
+        Returns:
+        - tuple: (spacings, period_counts)
+          - spacings (np.ndarray): The distances between consecutive occurrences of each repeated n-gram.
+          - period_counts (np.ndarray): An int64 array of length `max_period`; entry p - 1 is the number
+            of spacings divisible by p.
+
+        Notes:
+        - N-grams containing negative numbers (e.g., replaced unknown symbols) are ignored.
+        - All n-grams are encoded as integers and sorted once, so repeated n-grams are found without Python loops.
+          If `base ** gram_length` does not fit into an int64, the n-grams are sorted as rows of a matrix instead.
+        """
+        numbers = np.asarray(numbers, dtype=np.int64).ravel()
+        period_counts = np.zeros(max(max_period, 0), dtype=np.int64)
+        windows = numbers.size - gram_length + 1
+        if gram_length <= 0 or windows <= 1:
+            return np.zeros(0, dtype=np.int64), period_counts
+
+        base = max(int(numbers.max()) + 1, 1)
+        grams = np.lib.stride_tricks.sliding_window_view(numbers, gram_length)
+        positions = np.flatnonzero((grams >= 0).all(axis=1))
+        if base ** gram_length <= np.iinfo(np.int64).max:
+            keys = np.zeros(positions.size, dtype=np.int64)
+            for offset in range(gram_length):
+                keys = keys * base + numbers[positions + offset]
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            repeated = keys[1:] == keys[:-1]
+        else:
+            # lexsort is stable, so the occurrences of each n-gram stay in ascending order of position.
+            rows = grams[positions]
+            order = np.lexsort(rows.T[::-1])
+            rows = rows[order]
+            repeated = (rows[1:] == rows[:-1]).all(axis=1)
+        positions = positions[order]
+        spacings = (positions[1:] - positions[:-1])[repeated]
+
+        for period in range(1, max_period + 1):
+            period_counts[period - 1] = np.count_nonzero(spacings % period == 0)
+        return spacings, period_counts
+
     @staticmethod
     def map_numbers_into_text_space(numbers, alphabet, handling=HandlingOfUnknownSymbols.REMOVE, replace_character='?'):
         """
         Maps a list of numbers into text using a given alphabet.
 
         Parameters:
-        - numbers (list): List of numbers to map.
-        - alphabet (str): The alphabet for mapping.
+        - numbers (iterable): The numbers to map, e.g. a list, a NumPy array or a generator.
+        - alphabet (str or list): The alphabet for mapping.
         - handling (HandlingOfUnknownSymbols): How to handle unknown numbers.
         - replace_character (str): Replacement character for unknown numbers.
 
         Returns:
         - str: The resulting string.
+
+        Raises:
+        - ValueError: If the handling mode is invalid.
+
+        Notes:
+        - The numbers are mapped to code points with a precomputed array (see `SymbolMapper`) and the
+          string is built in one step, so the mapping takes linear time in the number of symbols.
+        - Alphabets with symbols of more than one character are mapped symbol by symbol instead.
         """
-        string = ""
-        if handling == HandlingOfUnknownSymbols.REMOVE:
-            for n in numbers:
-                if 0 <= n < len(alphabet):
-                    string += alphabet[n]
-        elif handling == HandlingOfUnknownSymbols.REPLACE:
+        if handling not in (HandlingOfUnknownSymbols.REMOVE, HandlingOfUnknownSymbols.REPLACE):
+            raise ValueError(f"Invalid handling mode: {handling}")
+        if SymbolMapper.alphabet_key(alphabet) is None:
+            string = ""
             for n in numbers:
                 if 0 <= n < len(alphabet):
                     string += alphabet[n]
-                else:
+                elif handling == HandlingOfUnknownSymbols.REPLACE:
                     string += replace_character
-        else:
+            return string
+        mapper = SymbolMapper.for_alphabet(alphabet)
+        return mapper.numbers_to_text(numbers, handling == HandlingOfUnknownSymbols.REMOVE, replace_character)
+
+    @staticmethod
+    def map_number_matrix_into_text_space(numbers, alphabet, handling=HandlingOfUnknownSymbols.REMOVE, replace_character='?'):
+        """
+        Maps every row of a 2-D matrix of numbers (e.g., a batch of candidate decryptions) into text.
+
+        Parameters:
+        - numbers (np.ndarray): The 2-D matrix of numbers, one candidate per row.
+        - alphabet (str): The alphabet for mapping.
+        - handling (HandlingOfUnknownSymbols): How to handle unknown numbers.
+        - replace_character (str): Replacement character for unknown numbers.
+
+        Returns:
+        - list: One string per row, each equal to `map_numbers_into_text_space` of that row.
+
+        Raises:
+        - ValueError: If the handling mode is invalid or the matrix is not 2-D.
+        """
+        if handling not in (HandlingOfUnknownSymbols.REMOVE, HandlingOfUnknownSymbols.REPLACE):
             raise ValueError(f"Invalid handling mode: {handling}")
-        return string
+        mapper = SymbolMapper.for_alphabet(alphabet)
+        return mapper.number_matrix_to_texts(numbers, handling == HandlingOfUnknownSymbols.REMOVE, replace_character)
 
     @staticmethod
     def map_text_into_number_space(text, alphabet, handling=HandlingOfUnknownSymbols.REMOVE, replace_number=-1):
@@ -280,7 +597,18 @@ class LanguageStatistics:
 
         Returns:
         - list: The resulting list of numbers.
+
+        Raises:
+        - ValueError: If the handling mode is invalid.
+
+        Notes:
+        - Use `map_text_into_number_array` to get a compact NumPy array instead of a list.
+        - Alphabets with symbols of more than one character and replacement values that are not integers
+          (e.g., None) cannot be held in a NumPy integer array; they are mapped symbol by symbol instead.
         """
+        if SymbolMapper.alphabet_key(alphabet) is not None and (handling == HandlingOfUnknownSymbols.REMOVE or
+                                                                isinstance(replace_number, (int, np.integer))):
+            return LanguageStatistics.map_text_into_number_array(text, alphabet, handling, replace_number).tolist()
         numlist = []
         if handling == HandlingOfUnknownSymbols.REMOVE:
             for c in text:
@@ -297,17 +625,137 @@ class LanguageStatistics:
         return numlist
 
     @staticmethod
-    def load_word_tree(language_code, language_statistics_directory):
+    def map_text_into_number_array(text, alphabet, handling=HandlingOfUnknownSymbols.REMOVE, replace_number=-1):
+        """
+        Maps text into a NumPy array of numbers using a given alphabet.
+
+        Parameters:
+        - text (str): The input text.
+        - alphabet (str or list): The alphabet for mapping, as a string or a list of single characters.
+        - handling (HandlingOfUnknownSymbols): How to handle unknown characters.
+        - replace_number (int): Replacement number for unknown characters.
+
+        Returns:
+        - np.ndarray: The resulting numbers as np.int8 array (np.int16 for alphabets with more than 127 symbols
+          or, with REPLACE handling, a replacement number outside of the np.int8 range).
+
+        Raises:
+        - ValueError: If the handling mode is invalid, a symbol of the alphabet is not a single character,
+          or unknown characters are replaced by something other than an integer.
+
+        Notes:
+        - Uses a lookup table indexed by code point that is built once per alphabet and cached (see `SymbolMapper`),
+          so the mapping takes linear time in the length of the text.
+        """
+        remove_unknown = LanguageStatistics.check_number_handling(handling, replace_number)
+        mapper = SymbolMapper.for_alphabet(alphabet)
+        return mapper.text_to_numbers(text, remove_unknown, replace_number if not remove_unknown else -1)
+
+    @staticmethod
+    def check_number_handling(handling, replace_number):
+        """
+        Validates how unknown characters are handled when text is mapped into a NumPy array of numbers.
+
+        Parameters:
+        - handling (HandlingOfUnknownSymbols): How to handle unknown characters.
+        - replace_number (int): Replacement number for unknown characters.
+
+        Returns:
+        - bool: True if unknown characters are removed, False if they are replaced.
+
+        Raises:
+        - ValueError: If the handling mode is invalid, or if unknown characters are replaced by something
+          other than an integer.
+        """
+        if handling == HandlingOfUnknownSymbols.REMOVE:
+            return True
+        if handling != HandlingOfUnknownSymbols.REPLACE:
+            raise ValueError(f"Invalid handling mode: {handling}")
+        if not isinstance(replace_number, (int, np.integer)):
+            raise ValueError(f"Replacement number must be an integer, got {replace_number!r}")
+        return False
+
+    @staticmethod
+    def iterate_text_into_number_space(source, alphabet, handling=HandlingOfUnknownSymbols.REMOVE, replace_number=-1,
+                                       overlap=0, chunk_size=1 << 20, uppercase=True):
+        """
+        Maps a large text into number space chunk by chunk, without holding the whole text in memory.
+
+        Parameters:
+        - source (file object or iterable): A text or binary (UTF-8) file object, or an iterable of str or bytes chunks.
+        - alphabet (str): The alphabet for mapping.
+        - handling (HandlingOfUnknownSymbols): How to handle unknown characters.
+        - replace_number (int): Replacement number for unknown characters.
+        - overlap (int): The number of symbols carried over from the previous chunk (default: 0). Use
+          `grams.gram_size() - 1` so that `grams.calculate_cost_of_chunks` over all chunks equals
+          `grams.calculate_cost` of the concatenated text.
+        - chunk_size (int): The number of characters (or bytes) read from a file object at once (default: 1 MiB).
+        - uppercase (bool): Whether to upper-case the text before mapping (default: True).
+
+        Returns:
+        - generator: Yields np.int8/np.int16 arrays, each starting with the last `overlap` numbers of the previous one.
+
+        Raises:
+        - ValueError: If the handling mode is invalid, a symbol of the alphabet is not a single character,
+          or unknown characters are replaced by something other than an integer.
+        """
+        remove_unknown = LanguageStatistics.check_number_handling(handling, replace_number)
+        mapper = SymbolMapper.for_alphabet(alphabet)
+        return mapper.iterate_numbers(source, remove_unknown, replace_number if not remove_unknown else -1,
+                                      overlap, chunk_size, uppercase)
+
+    @staticmethod
+    def load_word_tree(language_code, language_statistics_directory, compact=False, use_cache=False):
         """
         Loads a WordTree for a specific language.
 
         Parameters:
         - language_code (str): The language code.
         - language_statistics_directory (str): Path to the language statistics directory.
+        - compact (bool): Whether to load an array-backed CompactWordTree, which needs far less memory (default: False).
+        - use_cache (bool): Whether to open a memory-mapped snapshot next to the dictionary, writing it first if
+          it does not exist or is outdated (default: False). Implies `compact`.
 
         Returns:
-        - WordTree: The loaded WordTree object.
+        - WordTree or CompactWordTree: The loaded WordTree object.
         """
         filename = os.path.join(language_statistics_directory, f"Dictionary_{language_code}.dic")
+        if use_cache:
+            tree = CompactWordTree.load_snapshot(filename)
+            if tree is not None:
+                return tree
+            with gzip.open(filename, 'rb') as filestream:
+                tree = CompactWordTree.deserialize(filestream)
+            if tree.write_snapshot(filename):
+                return CompactWordTree.load_snapshot(filename) or tree
+            return tree
         with gzip.open(filename, 'rb') as filestream:
+            if compact:
+                return CompactWordTree.deserialize(filestream)
             return WordTree.deserialize(filestream)
+
+    @staticmethod
+    def load_aho_corasick(language_code, language_statistics_directory, use_cache=False):
+        """
+        Loads the dictionary of a specific language as an Aho–Corasick automaton for finding all words in a text.
+
+        Parameters:
+        - language_code (str): The language code.
+        - language_statistics_directory (str): Path to the language statistics directory.
+        - use_cache (bool): Whether to open the memory-mapped tree snapshot and automaton next to the dictionary,
+          writing them first if they do not exist or are outdated (default: False).
+
+        Returns:
+        - AhoCorasick: The automaton.
+        """
+        tree = LanguageStatistics.load_word_tree(language_code, language_statistics_directory, True, use_cache)
+        if not use_cache:
+            return AhoCorasick.build(tree)
+        filename = os.path.join(language_statistics_directory, f"Dictionary_{language_code}.dic")
+        automaton = AhoCorasick.load_cache(filename, tree)
+        if automaton is not None:
+            return automaton
+        automaton = AhoCorasick.build(tree)
+        if automaton.write_cache(filename):
+            return AhoCorasick.load_cache(filename, tree) or automaton
+        return automaton
@@ -16,6 +16,8 @@
 import struct
 import numpy as np
 import gzip
+import os
+from languagestatisticslibpy.AtomicFileWriter import AtomicFileWriter
 
 import gzip
 import struct
@@ -30,9 +32,24 @@ class LanguageStatisticsFile:
     - file_path (str): The path to the language statistics file.
     - alphabet (str): The alphabet used in the language statistics.
     - language_code (str): The language code extracted from the statistics file.
+    - max_value (float or None): The maximum value stored in a cache file, set when loading from a cache file.
+
+    Cache files:
+    - A cache file is an uncompressed sidecar file next to the .gz file (e.g. `en-5gram-nocs.gz.cache`).
+    - It consists of a header (magic number, format version, size and modification time of the .gz file,
+      gram length, table dimension, normalization, maximum value, language code and alphabet), padded to
+      CACHE_ALIGNMENT bytes, followed by the float32 table.
+    - The table is opened read-only with `np.memmap`, so its pages are shared between processes via the
+      operating system's page cache.
+    - A cache file is only used if its format version, gram length, and the size and modification time of
+      the .gz file match; otherwise it is rewritten.
     """
 
     FILE_FORMAT_MAGIC_NUMBER = "CTLS"
+    CACHE_FILE_MAGIC_NUMBER = b"CTLSMMAP"
+    CACHE_FILE_FORMAT_VERSION = 1
+    CACHE_HEADER_FORMAT = '<8sIqqii?dd'
+    CACHE_ALIGNMENT = 64
 
     def __init__(self, file_path):
         """
@@ -49,60 +66,267 @@ class LanguageStatisticsFile:
         self.file_path = file_path
         self.alphabet = ''
         self.language_code = ''
+        self.max_value = None
 
-    def load_frequencies(self, array_dimensions):
+    def load_frequencies(self, array_dimensions, use_cache=False, progress_callback=None):
         """
         Loads the frequency data from the language statistics file.
 
         Parameters:
         - array_dimensions (int): The dimensionality of the frequency array (e.g., 1 for unigrams, 2 for bigrams).
+        - use_cache (bool): Whether to use a memory-mapped cache file next to the .gz file (default: False).
+          If there is no valid cache file, the .gz file is loaded and the cache file is written.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after
+          each chunk of frequency data read from the .gz file (default: None).
 
         Returns:
         - np.ndarray: A numpy array containing the frequency data.
 
         Raises:
-        - Exception: If the file format is invalid or the dimensions of the frequency array do not match the expected value.
+        - Exception: If the file format is invalid, the dimensions of the frequency array do not match the expected value,
+          or the file is truncated.
 
         Process:
         1. Validates the file by checking the magic number.
         2. Reads the language code, gram length, and alphabet.
         3. Verifies that the gram length matches the required dimensions.
-        4. Reads the frequency data and reshapes it into the appropriate numpy array format.
-        5. Copies the data into a new numpy array to allow modification.
-        """
-        with gzip.open(self.file_path, 'rb') as file:
-            # Validate the file format by checking the magic number.
-            magic_number = file.read(4).decode('utf-8')
-            if magic_number != self.FILE_FORMAT_MAGIC_NUMBER:
-                raise Exception("File does not start with the expected magic number for language statistics.")
+        4. Preallocates the frequency array and fills it chunk by chunk from the decompressed stream.
+        5. Reshapes the array into the appropriate dimensionality.
 
-            # Read the language code (length-prefixed string).
-            language_code_length_bytes = file.read(1)[0]
-            self.language_code = file.read(language_code_length_bytes).decode('utf-8')
+        Notes:
+        - The peak memory is one table plus the small buffers of the gzip stream; no intermediate
+          `bytes` object or copy of the table is created.
+        - With `use_cache`, the returned array is a read-only `np.memmap` if the cache file could be used or written.
+        """
+        if use_cache:
+            frequencies = self.load_cached_frequencies(array_dimensions)
+            if frequencies is not None:
+                return frequencies
 
-            # Read the gram length (32-bit signed integer).
-            gram_length = struct.unpack('<i', file.read(4))[0]
+        with gzip.open(self.file_path, 'rb') as file:
+            gram_length = self.read_header(file)
 
             # Ensure the gram length matches the required dimensions.
             if gram_length != array_dimensions:
                 raise Exception("Gram length of statistics file differs from required dimensions of frequency array.")
 
-            # Read the alphabet (length-prefixed string).
-            self.alphabet_length = file.read(1)[0]
-            self.alphabet = file.read(self.alphabet_length).decode('utf-8')
-
             # Calculate the total number of frequency entries.
             frequency_entries = self.alphabet_length ** gram_length
 
-            # Read the frequency data (32-bit float array).
-            frequency_data = file.read(frequency_entries * 4)
+            # Read the frequency data (32-bit float array) directly into the preallocated array.
+            frequencies = np.empty(frequency_entries, dtype=np.float32)
+            self.read_into(file, frequencies, progress_callback)
+
+            # Reshape the data into the correct dimensionality (a view, no copy).
+            if array_dimensions != 1:
+                frequencies = frequencies.reshape(tuple([self.alphabet_length] * array_dimensions))
+
+        if use_cache and self.write_cached_frequencies(frequencies):
+            return self.load_cached_frequencies(array_dimensions)
+        return frequencies
+
+    def read_header(self, file):
+        """
+        Reads the header of the language statistics file from an opened (decompressed) stream.
+
+        Parameters:
+        - file (file object): The decompressed stream, positioned at the start of the file.
+
+        Returns:
+        - int: The gram length of the statistics file.
+
+        Raises:
+        - Exception: If the file does not start with the expected magic number.
+
+        Notes:
+        - Sets `self.language_code`, `self.alphabet_length` and `self.alphabet`; afterwards, the stream is
+          positioned at the first frequency entry.
+        """
+        # Validate the file format by checking the magic number.
+        magic_number = file.read(4).decode('utf-8')
+        if magic_number != self.FILE_FORMAT_MAGIC_NUMBER:
+            raise Exception("File does not start with the expected magic number for language statistics.")
+
+        # Read the language code (length-prefixed string).
+        language_code_length_bytes = file.read(1)[0]
+        self.language_code = file.read(language_code_length_bytes).decode('utf-8')
+
+        # Read the gram length (32-bit signed integer).
+        gram_length = struct.unpack('<i', file.read(4))[0]
+
+        # Read the alphabet (length-prefixed string).
+        self.alphabet_length = file.read(1)[0]
+        self.alphabet = file.read(self.alphabet_length).decode('utf-8')
+
+        return gram_length
+
+    def load_header(self):
+        """
+        Reads only the header of the language statistics file, without loading the frequency data.
+
+        Returns:
+        - int: The gram length of the statistics file.
+
+        Raises:
+        - Exception: If the file does not start with the expected magic number.
+
+        Notes:
+        - Sets `self.language_code`, `self.alphabet_length` and `self.alphabet`.
+        """
+        with gzip.open(self.file_path, 'rb') as file:
+            return self.read_header(file)
+
+    def iterate_frequencies(self, array_dimensions, chunk_entries=1 << 20, progress_callback=None):
+        """
+        Streams the frequency data of the language statistics file in chunks.
+
+        Parameters:
+        - array_dimensions (int): The expected gram length of the statistics file.
+        - chunk_entries (int): The number of frequency entries per chunk (default: 1048576).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each chunk
+          (default: None).
+
+        Yields:
+        - tuple: (start, chunk), the flat index of the first entry of the chunk and a 1D float32 array of the entries.
+
+        Raises:
+        - Exception: If the file format is invalid, the gram length differs, or the file is truncated.
+
+        Notes:
+        - Only one chunk is held in memory at a time, so even tables that do not fit into memory can be processed.
+        """
+        with gzip.open(self.file_path, 'rb') as file:
+            gram_length = self.read_header(file)
+            if gram_length != array_dimensions:
+                raise Exception("Gram length of statistics file differs from required dimensions of frequency array.")
+
+            frequency_entries = self.alphabet_length ** gram_length
+            for start in range(0, frequency_entries, chunk_entries):
+                count = min(chunk_entries, frequency_entries - start)
+                data = file.read(count * 4)
+                if len(data) != count * 4:
+                    raise Exception("Language statistics file is truncated.")
+                if progress_callback is not None:
+                    progress_callback((start + count) * 4, frequency_entries * 4)
+                yield start, np.frombuffer(data, dtype='<f4')
+
+    def read_into(self, file, frequencies, progress_callback=None, chunk_size=1 << 22):
+        """
+        Fills a preallocated array with frequency data read from a (decompressed) stream.
+
+        Parameters:
+        - file (file object): The stream, positioned at the first frequency entry to read.
+        - frequencies (np.ndarray): The contiguous float32 array to fill completely.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each chunk.
+        - chunk_size (int): The maximum number of bytes read per call (default: 4 MiB).
+
+        Raises:
+        - Exception: If the stream ends before the array is filled.
+        """
+        target = memoryview(frequencies).cast('B')
+        total = len(target)
+        position = 0
+        while position < total:
+            read = file.readinto(target[position:position + chunk_size])
+            if not read:
+                raise Exception(f"Language statistics file is truncated: expected {total} bytes of frequency data, got {position}.")
+            position += read
+            if progress_callback is not None:
+                progress_callback(position, total)
+
+    def cache_file_path(self, normalize_to=None):
+        """
+        Returns the path of the cache file belonging to the language statistics file.
+
+        Parameters:
+        - normalize_to (float or None): The normalization value of the cached table, or None for the raw table.
+
+        Returns:
+        - str: The path of the cache file.
+        """
+        if normalize_to is None:
+            return f"{self.file_path}.cache"
+        return f"{self.file_path}.{float(normalize_to)!r}.cache"
+
+    def load_cached_frequencies(self, array_dimensions, normalize_to=None):
+        """
+        Opens the frequency table of a valid cache file as a read-only memory map.
+
+        Parameters:
+        - array_dimensions (int): The dimensionality of the frequency array.
+        - normalize_to (float or None): The normalization value of the cached table, or None for the raw table.
+
+        Returns:
+        - np.memmap or None: The frequency table, or None if the cache file does not exist or is outdated.
+
+        Notes:
+        - Sets `self.language_code`, `self.alphabet`, `self.alphabet_length` and `self.max_value` from the cache file header.
+        """
+        cache_path = self.cache_file_path(normalize_to)
+        try:
+            source_stat = os.stat(self.file_path)
+            with open(cache_path, 'rb') as file:
+                header = file.read(struct.calcsize(self.CACHE_HEADER_FORMAT))
+                (magic_number, version, source_size, source_mtime, gram_length, dimension,
+                 normalized, normalization, max_value) = struct.unpack(self.CACHE_HEADER_FORMAT, header)
+                language_code = file.read(file.read(1)[0]).decode('utf-8')
+                alphabet = file.read(struct.unpack('<H', file.read(2))[0]).decode('utf-8')
+                header_size = file.tell()
+        except (OSError, struct.error, IndexError, UnicodeDecodeError):
+            return None
+
+        if magic_number != self.CACHE_FILE_MAGIC_NUMBER or version != self.CACHE_FILE_FORMAT_VERSION:
+            return None
+        if source_size != source_stat.st_size or source_mtime != source_stat.st_mtime_ns:
+            return None
+        if gram_length != array_dimensions or normalized != (normalize_to is not None):
+            return None
+        if normalize_to is not None and normalization != float(normalize_to):
+            return None
+
+        offset = -(-header_size // self.CACHE_ALIGNMENT) * self.CACHE_ALIGNMENT
+        shape = tuple([dimension] * array_dimensions)
+        if os.path.getsize(cache_path) != offset + dimension ** array_dimensions * 4:
+            return None
+
+        self.language_code = language_code
+        self.alphabet = alphabet
+        self.alphabet_length = dimension
+        self.max_value = max_value
+        return np.memmap(cache_path, dtype='<f4', mode='r', offset=offset, shape=shape)
+
+    def write_cached_frequencies(self, frequencies, max_value=None, normalize_to=None):
+        """
+        Writes a frequency table into a cache file next to the language statistics file.
+
+        Parameters:
+        - frequencies (np.ndarray): The frequency table to cache.
+        - max_value (float or None): The maximum value belonging to the table (default: maximum of the table).
+        - normalize_to (float or None): The normalization value of the table, or None for the raw table.
+
+        Returns:
+        - bool: True if the cache file was written, False if it could not be written (e.g., read-only directory).
+
+        Notes:
+        - The file is written by `AtomicFileWriter`, so concurrent readers never see partial files and concurrent
+          writers (processes or threads) never write into the same temporary file.
+        """
+        if max_value is None:
+            max_value = np.max(frequencies) if frequencies.size > 0 else float('-inf')
+        language_code = self.language_code.encode('utf-8')
+        alphabet = self.alphabet.encode('utf-8')
+        try:
+            source_stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        header = struct.pack(self.CACHE_HEADER_FORMAT, self.CACHE_FILE_MAGIC_NUMBER, self.CACHE_FILE_FORMAT_VERSION,
+                             source_stat.st_size, source_stat.st_mtime_ns, frequencies.ndim, frequencies.shape[0],
+                             normalize_to is not None, float(normalize_to or 0.0), float(max_value))
+        header += bytes([len(language_code)]) + language_code + struct.pack('<H', len(alphabet)) + alphabet
+        header += bytes(-len(header) % self.CACHE_ALIGNMENT)
 
-            # Reshape the data into the correct dimensionality and copy it for mutability.
-            if array_dimensions == 1:
-                frequencies = np.frombuffer(frequency_data, dtype=np.float32).copy()
-            else:
-                frequencies = np.frombuffer(frequency_data, dtype=np.float32).reshape(
-                    tuple([self.alphabet_length] * array_dimensions)
-                ).copy()
+        def write_content(file):
+            file.write(header)
+            np.ascontiguousarray(frequencies, dtype='<f4').tofile(file)
 
-            return frequencies
+        return AtomicFileWriter.write(self.cache_file_path(normalize_to), write_content)
@@ -0,0 +1,226 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import gzip
+import json
+import os
+import re
+from languagestatisticslibpy.AtomicFileWriter import AtomicFileWriter
+from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
+from languagestatisticslibpy.WordTree import WordTree
+
+class LanguageStatisticsIndex:
+    """
+    Index of the language statistics files and dictionaries of a directory.
+
+    The index is built by reading only the headers of the files, and it is cached in a small JSON
+    manifest inside the directory. On the next scan, only files whose size or modification time
+    changed are read again.
+
+    Attributes:
+    - MANIFEST_FILENAME (str): The name of the manifest file inside the directory.
+    - MANIFEST_VERSION (int): The format version of the manifest.
+    - directory (str): The scanned directory.
+    - grams (list): One dict per statistics file with the keys "filename", "language_code", "gram_length",
+      "use_spaces", "alphabet", "alphabet_length", "entries" and "memory_bytes" (float32 table size).
+    - dictionaries (list): One dict per dictionary file with the keys "filename", "language_code",
+      "alphabet" and "stored_words".
+    """
+
+    MANIFEST_FILENAME = "LanguageStatisticsIndex.json"
+    MANIFEST_VERSION = 1
+    GRAMS_FILENAME_PATTERN = re.compile(r"^(?P<language>[^-]+)-(?P<size>\d+)gram-nocs(?P<spaces>-sp)?\.gz$")
+    DICTIONARY_FILENAME_PATTERN = re.compile(r"^Dictionary_(?P<language>.+)\.dic$")
+
+    def __init__(self, directory, grams, dictionaries):
+        """
+        Initializes the index. Use `scan` instead of calling this directly.
+
+        Parameters:
+        - directory (str): The scanned directory.
+        - grams (list): The entries of the statistics files.
+        - dictionaries (list): The entries of the dictionary files.
+        """
+        self.directory = directory
+        self.grams = grams
+        self.dictionaries = dictionaries
+
+    @staticmethod
+    def scan(directory, use_manifest=True):
+        """
+        Scans a directory for language statistics files and dictionaries.
+
+        Parameters:
+        - directory (str): The directory to scan.
+        - use_manifest (bool): Whether to reuse and update the JSON manifest in the directory (default: True).
+
+        Returns:
+        - LanguageStatisticsIndex: The index of the directory.
+
+        Notes:
+        - Files that cannot be parsed are skipped.
+        - If the manifest cannot be written (e.g., read-only directory), the index is still returned.
+        """
+        manifest_path = os.path.join(directory, LanguageStatisticsIndex.MANIFEST_FILENAME)
+        cached_files = {}
+        if use_manifest:
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as file:
+                    manifest = json.load(file)
+                if manifest.get("version") == LanguageStatisticsIndex.MANIFEST_VERSION:
+                    cached_files = manifest.get("files", {})
+            except (OSError, ValueError):
+                pass
+
+        files = {}
+        changed = False
+        for filename in sorted(os.listdir(directory)):
+            is_grams = LanguageStatisticsIndex.GRAMS_FILENAME_PATTERN.match(filename)
+            is_dictionary = LanguageStatisticsIndex.DICTIONARY_FILENAME_PATTERN.match(filename)
+            if not is_grams and not is_dictionary:
+                continue
+            try:
+                stat = os.stat(os.path.join(directory, filename))
+            except OSError:
+                continue
+
+            cached = cached_files.get(filename)
+            if cached is not None and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                files[filename] = cached
+                continue
+
+            changed = True
+            try:
+                if is_grams:
+                    entry = LanguageStatisticsIndex.read_grams_entry(directory, filename, is_grams.group("spaces") is not None)
+                else:
+                    entry = LanguageStatisticsIndex.read_dictionary_entry(directory, filename)
+            except Exception:
+                continue
+            files[filename] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "kind": "grams" if is_grams else "dictionary", "entry": entry}
+
+        if use_manifest and (changed or set(files) != set(cached_files)):
+            manifest = {"version": LanguageStatisticsIndex.MANIFEST_VERSION, "files": files}
+            AtomicFileWriter.write(manifest_path, lambda file: json.dump(manifest, file, ensure_ascii=False, indent=1), binary=False)
+
+        grams = [file["entry"] for file in files.values() if file["kind"] == "grams"]
+        dictionaries = [file["entry"] for file in files.values() if file["kind"] == "dictionary"]
+        return LanguageStatisticsIndex(directory, grams, dictionaries)
+
+    @staticmethod
+    def read_grams_entry(directory, filename, use_spaces):
+        """
+        Reads the header of a statistics file and describes it.
+
+        Parameters:
+        - directory (str): The directory of the file.
+        - filename (str): The name of the file.
+        - use_spaces (bool): Whether the file includes spaces (from the "-sp" filename suffix).
+
+        Returns:
+        - dict: The index entry of the file.
+        """
+        language_statistics_file = LanguageStatisticsFile(os.path.join(directory, filename))
+        gram_length = language_statistics_file.load_header()
+        entries = language_statistics_file.alphabet_length ** gram_length
+        return {
+            "filename": filename,
+            "language_code": language_statistics_file.language_code,
+            "gram_length": gram_length,
+            "use_spaces": use_spaces,
+            "alphabet": language_statistics_file.alphabet,
+            "alphabet_length": language_statistics_file.alphabet_length,
+            "entries": entries,
+            "memory_bytes": entries * 4,
+        }
+
+    @staticmethod
+    def read_dictionary_entry(directory, filename):
+        """
+        Reads the header of a dictionary file and describes it.
+
+        Parameters:
+        - directory (str): The directory of the file.
+        - filename (str): The name of the file.
+
+        Returns:
+        - dict: The index entry of the file.
+        """
+        with gzip.open(os.path.join(directory, filename), 'rb') as filestream:
+            language_code, alphabet, stored_words = WordTree.read_header(filestream)
+        return {
+            "filename": filename,
+            "language_code": language_code,
+            "alphabet": alphabet,
+            "stored_words": stored_words,
+        }
+
+    def find_grams(self, language_code, gram_length, use_spaces=False):
+        """
+        Looks up the statistics file for a language, gram length and space usage.
+
+        Parameters:
+        - language_code (str): The language code.
+        - gram_length (int): The size of the grams.
+        - use_spaces (bool): Whether the statistics include spaces (default: False).
+
+        Returns:
+        - dict or None: The index entry, or None if there is no such file.
+        """
+        for entry in self.grams:
+            if entry["language_code"] == language_code and entry["gram_length"] == gram_length and entry["use_spaces"] == use_spaces:
+                return entry
+        return None
+
+    def find_dictionary(self, language_code):
+        """
+        Looks up the dictionary file of a language.
+
+        Parameters:
+        - language_code (str): The language code.
+
+        Returns:
+        - dict or None: The index entry, or None if there is no such file.
+        """
+        for entry in self.dictionaries:
+            if entry["language_code"] == language_code:
+                return entry
+        return None
+
+    def languages(self):
+        """
+        Returns the language codes of all indexed statistics files and dictionaries.
+
+        Returns:
+        - list: The sorted language codes.
+        """
+        return sorted({entry["language_code"] for entry in self.grams + self.dictionaries})
+
+    def memory_bytes(self, language_codes=None, gram_lengths=None, use_spaces=None):
+        """
+        Sums up the expected in-memory size of the float32 tables of the selected statistics files.
+
+        Parameters:
+        - language_codes (iterable or None): The languages to include, None for all (default: None).
+        - gram_lengths (iterable or None): The gram lengths to include, None for all (default: None).
+        - use_spaces (bool or None): Only include files with or without spaces, None for both (default: None).
+
+        Returns:
+        - int: The expected number of bytes.
+        """
+        return sum(entry["memory_bytes"] for entry in self.grams
+                   if (language_codes is None or entry["language_code"] in language_codes)
+                   and (gram_lengths is None or entry["gram_length"] in gram_lengths)
+                   and (use_spaces is None or entry["use_spaces"] == use_spaces))
@@ -23,9 +23,11 @@ class Node:
     - TerminationSymbol (str): A constant indicating the end of a tree branch (default: `chr(0)`).
     - value (str or None): The character or value stored in this node.
     - word_ends_here (bool): Whether this node marks the end of a word.
-    - child_nodes (list): A list of child nodes connected to this node.
+    - child_nodes (dict): The child nodes connected to this node, keyed by their character (in insertion order).
     """
 
+    __slots__ = ('value', 'word_ends_here', 'child_nodes')  # No per-node __dict__, as a dictionary has many nodes
+
     WordEndSymbol = chr(1)  # Constant for the symbol indicating the end of a word
     TerminationSymbol = chr(0)  # Constant for the symbol indicating the end of the tree
 
@@ -39,11 +41,11 @@ class Node:
         Initializes:
         - self.value (str or None): The value of this node.
         - self.word_ends_here (bool): Set to False initially, indicating that no word ends here.
-        - self.child_nodes (list): An empty list to hold child nodes.
+        - self.child_nodes (dict): An empty dict to hold child nodes, keyed by their character.
         """
         self.value = value
         self.word_ends_here = False
-        self.child_nodes = []
+        self.child_nodes = {}
 
     def __eq__(self, other):
         """
@@ -67,8 +69,8 @@ class Node:
             return False
         if len(self.child_nodes) != len(other.child_nodes):
             return False
-        for i in range(len(self.child_nodes)):
-            if self.child_nodes[i] != other.child_nodes[i]:
+        for child_node, other_child_node in zip(self.child_nodes.values(), other.child_nodes.values()):
+            if child_node != other_child_node:
                 return False
         return True
 
@@ -84,6 +86,6 @@ class Node:
         """
         hash_value = hash(self.value)
         hash_value = hash_value * 31 + hash(self.word_ends_here)
-        for child_node in self.child_nodes:
+        for child_node in self.child_nodes.values():
             hash_value = hash_value * 31 + hash(child_node)
         return hash_value
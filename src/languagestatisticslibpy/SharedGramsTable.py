@@ -0,0 +1,164 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import sys
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+class SharedGramsTable:
+    """
+    Shares the frequency table of a grams object between processes using `multiprocessing.shared_memory`.
+
+    The publishing process copies the table once into a shared memory block and passes the (picklable)
+    `descriptor` to its workers, e.g. via the `initargs` of a `multiprocessing.Pool`. Each worker attaches
+    to the block and gets a grams object of the original class whose frequencies are a read-only view
+    of the shared memory, so the table exists only once regardless of the number of workers.
+
+    Usage:
+    - Publisher: `table = SharedGramsTable.publish(grams)`, pass `table.descriptor` to the workers,
+      and call `table.unlink()` (or use `with table:`) once all workers are done.
+    - Worker: `grams = SharedGramsTable.attach(descriptor).grams`.
+
+    Attributes:
+    - shared_memory (SharedMemory): The shared memory block holding the table.
+    - descriptor (dict): Everything needed to attach to the table (name, shape, dtype, class, alphabet, ...).
+    - owner (bool): Whether this object created the shared memory block and is responsible for unlinking it.
+    - grams (Grams): The grams object backed by the shared memory block.
+    """
+
+    def __init__(self, shared_memory_block, descriptor, owner):
+        """
+        Initializes the shared table. Use `publish` or `attach` instead of calling this directly.
+
+        Parameters:
+        - shared_memory_block (SharedMemory): The shared memory block holding the table.
+        - descriptor (dict): The descriptor of the table.
+        - owner (bool): Whether this object created the shared memory block.
+        """
+        self.shared_memory = shared_memory_block
+        self.descriptor = descriptor
+        self.owner = owner
+        self.unlinked = False
+
+        frequencies = np.ndarray(descriptor["shape"], dtype=descriptor["dtype"], buffer=shared_memory_block.buf)
+        frequencies.flags.writeable = False
+        self.grams = descriptor["grams_class"].from_frequencies(descriptor["language"], descriptor["alphabet"], frequencies,
+                                                                descriptor["max_value"], descriptor["is_normalized"])
+        self.grams.add_letter_indices = descriptor["add_letter_indices"]
+        self.grams.quantization_scale = descriptor["quantization_scale"]
+        self.grams.quantization_offset = descriptor["quantization_offset"]
+
+    @staticmethod
+    def publish(grams, name=None):
+        """
+        Copies the frequency table of a grams object into a new shared memory block.
+
+        Parameters:
+        - grams (Grams): The grams object to share.
+        - name (str or None): The name of the shared memory block (default: None, a unique name is generated).
+
+        Returns:
+        - SharedGramsTable: The owning shared table.
+
+        Raises:
+        - Exception: If the grams object has no dense frequency table (e.g. SparseGrams).
+        """
+        if grams.frequencies is None:
+            raise Exception(f"{type(grams).__name__} has no dense frequency table to share!")
+        frequencies = np.ascontiguousarray(grams.frequencies)
+        shared_memory_block = shared_memory.SharedMemory(name=name, create=True, size=max(frequencies.nbytes, 1))
+        try:
+            np.ndarray(frequencies.shape, dtype=frequencies.dtype, buffer=shared_memory_block.buf)[...] = frequencies
+            descriptor = {
+                "name": shared_memory_block.name,
+                "shape": frequencies.shape,
+                "dtype": frequencies.dtype.str,
+                "grams_class": type(grams),
+                "language": getattr(grams, "language", ""),
+                "alphabet": grams.alphabet,
+                "max_value": float(grams.max_value),
+                "is_normalized": grams.is_normalized,
+                "add_letter_indices": grams.add_letter_indices,
+                "quantization_scale": grams.quantization_scale,
+                "quantization_offset": grams.quantization_offset,
+            }
+            return SharedGramsTable(shared_memory_block, descriptor, True)
+        except BaseException:
+            shared_memory_block.close()
+            shared_memory_block.unlink()
+            raise
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        Attaches to a shared table published by another process.
+
+        Parameters:
+        - descriptor (dict): The `descriptor` of the published table.
+
+        Returns:
+        - SharedGramsTable: The non-owning shared table. Its `grams` can be used like a normally loaded grams object.
+
+        Notes:
+        - A worker exiting never removes the block; only the owner unlinks it. Before Python 3.13, attaching
+          registers the block with the resource tracker. Workers started by `multiprocessing` share the
+          tracker of their parent, so this is harmless there. A process with its own tracker unregisters
+          the block again, as its tracker would otherwise remove the block when the process exits.
+        """
+        if sys.version_info >= (3, 13):
+            shared_memory_block = shared_memory.SharedMemory(name=descriptor["name"], track=False)
+        else:
+            has_shared_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is not None
+            shared_memory_block = shared_memory.SharedMemory(name=descriptor["name"])
+            if not has_shared_tracker:
+                resource_tracker.unregister(shared_memory_block._name, "shared_memory")
+        return SharedGramsTable(shared_memory_block, descriptor, False)
+
+    def close(self):
+        """
+        Releases the grams object and detaches from the shared memory block of this process.
+
+        Notes:
+        - The grams object must not be used anymore afterwards; its frequencies are set to None.
+        - Raises BufferError if other references to the frequency array are still alive.
+        """
+        if self.grams is None:
+            return
+        self.grams.frequencies = None
+        self.grams = None
+        self.shared_memory.close()
+
+    def unlink(self):
+        """
+        Closes the shared table and removes the shared memory block from the system.
+
+        Raises:
+        - Exception: If this object is not the owner of the shared memory block.
+        """
+        if not self.owner:
+            raise Exception("Only the publishing process may unlink the shared grams table!")
+        self.close()
+        if not self.unlinked:
+            self.shared_memory.unlink()
+            self.unlinked = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.owner:
+            self.unlink()
+        else:
+            self.close()
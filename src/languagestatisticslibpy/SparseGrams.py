@@ -0,0 +1,258 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import numpy as np
+import os
+from languagestatisticslibpy.Grams import Grams
+from languagestatisticslibpy.GramsType import GramsType
+from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
+
+class SparseGrams(Grams):
+    """
+    N-gram statistics of any size that only store the observed n-grams.
+
+    Instead of a dense table with |alphabet|^n entries, only the entries that differ from a floor value
+    are kept: their flat indices in a sorted array (`keys`) and their values in a parallel array (`values`).
+    Every other n-gram costs `floor_value`. This makes hexagrams (and higher orders) fit into memory.
+
+    Attributes:
+    - size (int): The size of the grams.
+    - dimension (int): The number of table entries along each axis of the (virtual) dense table.
+    - keys (np.ndarray): The sorted flat indices of the stored n-grams.
+    - values (np.ndarray): The float32 values of the stored n-grams.
+    - floor_value (float): The value of every n-gram that is not stored.
+    - frequencies (None): There is no dense table.
+
+    Usage:
+    - `LanguageStatistics.create_grams(..., sparse=True)`, `LanguageStatistics.create_grams_by_size(..., sparse=True)`
+      and `LanguageStatistics.get_grams(..., sparse=True)` return SparseGrams instead of the dense classes.
+
+    Unsupported Grams APIs:
+    - `frequencies` is None, so everything working on the dense table is not available: `from_frequencies`,
+      `quantize` and `quantization_report`, and publishing with `SharedGramsTable.publish`.
+    - There is no lazy loading (`lazy`, `materialize`) and no cache file (`use_cache`, `load_normalized`
+      always normalizes in memory).
+    """
+
+    def __init__(self, language, language_statistics_directory, use_spaces=False, *, gram_size=6, floor_value=None, normalize_to=None,
+                 progress_callback=None):
+        """
+        Initializes the SparseGrams class by calling the parent class (Grams) initializer.
+
+        Parameters:
+        - language (str): The language of the n-gram statistics.
+        - language_statistics_directory (str): Path to the directory containing language statistics files.
+        - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - gram_size (int): The size of the grams; keyword-only (default: 6).
+        - floor_value (float or None): The value of n-grams that are not stored. If None, the smallest value
+          of the statistics file is used, which needs one additional pass over the file (default: None).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          n-grams are collected from the .gz file (default: None).
+        """
+        self.size = gram_size
+        self.floor_value = floor_value
+        super().__init__(language, language_statistics_directory, use_spaces, False, normalize_to, False, progress_callback)
+
+    def load_gz(self, filename, language_statistics_directory, progress_callback=None):
+        """
+        Loads the observed n-grams of a gzip-compressed statistics file.
+
+        Parameters:
+        - filename (str): The name of the file to load.
+        - language_statistics_directory (str): The directory where the statistics file is located.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each
+          chunk of the pass that collects the n-grams (not during the pass that determines the floor value) (default: None).
+
+        Sets:
+        - self.keys (np.ndarray): The sorted flat indices of all entries that differ from the floor value.
+        - self.values (np.ndarray): The values of these entries.
+        - self.floor_value (float): The value of all other entries.
+        - self.dimension (int): The number of table entries along each axis.
+        - self.alphabet (str): The alphabet used in the statistics file.
+        - self.max_value (float): The maximum value of all entries, or -∞ if the table is empty.
+
+        Notes:
+        - The file body is streamed chunk by chunk; the dense table is never allocated.
+        """
+        file_path = os.path.join(language_statistics_directory, filename)
+        language_statistics_file = LanguageStatisticsFile(file_path)
+        language_statistics_file.load_header()
+        self.dimension = language_statistics_file.alphabet_length
+
+        if self.floor_value is None:
+            floor_value = np.inf
+            for start, chunk in language_statistics_file.iterate_frequencies(self.size):
+                if chunk.size > 0:
+                    floor_value = min(floor_value, float(chunk.min()))
+            self.floor_value = floor_value if floor_value != np.inf else 0.0
+
+        key_dtype = np.uint32 if self.dimension ** self.size <= np.iinfo(np.uint32).max else np.int64
+        keys = []
+        values = []
+        for start, chunk in language_statistics_file.iterate_frequencies(self.size, progress_callback=progress_callback):
+            observed = np.flatnonzero(chunk != self.floor_value)
+            keys.append((observed + start).astype(key_dtype))
+            values.append(chunk[observed].astype(np.float32))
+
+        self.alphabet = language_statistics_file.alphabet
+        self.keys = np.concatenate(keys) if keys else np.zeros(0, dtype=key_dtype)
+        self.values = np.concatenate(values) if values else np.zeros(0, dtype=np.float32)
+        self.frequencies = None
+        self.max_value = self.maximum()
+
+    def maximum(self):
+        """
+        Returns the maximum value of all (stored and floor) entries.
+
+        Returns:
+        - float: The maximum value, or -∞ if the table is empty.
+        """
+        if self.dimension == 0:
+            return float('-inf')
+        if self.values.size == 0:
+            return np.float32(self.floor_value)
+        if self.values.size < self.dimension ** self.size:
+            return max(np.max(self.values), np.float32(self.floor_value))
+        return np.max(self.values)
+
+    def calculate_cost(self, text):
+        """
+        Calculates the cost of a given text based on the n-gram frequencies.
+
+        Parameters:
+        - text (list or np.ndarray): The text to analyze, mapped into number space.
+
+        Returns:
+        - float: The average cost of the n-grams in the text. Returns 0.0 if the text is shorter than the gram size.
+
+        Notes:
+        - The text may be a list or a NumPy array of symbol indices; all windows are looked up in one vectorized pass.
+        - Skips n-grams containing characters outside the defined alphabet.
+        """
+        if len(text) < self.size:
+            return 0.0
+
+        end = len(text) - self.size + 1
+        return self.sum_of_costs(text) / end
+
+    def gram_size(self):
+        """
+        Returns the size of the grams being analyzed.
+
+        Returns:
+        - int: The size of the grams.
+        """
+        return self.size
+
+    def grams_type(self):
+        """
+        Returns the type of grams being analyzed.
+
+        Returns:
+        - GramsType: The GramsType of the gram size, or GramsType.Undefined for sizes above 6.
+        """
+        try:
+            return GramsType(self.size)
+        except ValueError:
+            return GramsType.Undefined
+
+    def table_dimension(self):
+        """
+        Returns the number of entries of the (virtual) dense table along each axis.
+
+        Returns:
+        - int: The base used for computing flat n-gram indices.
+        """
+        return self.dimension
+
+    def lookup(self, indices):
+        """
+        Looks up the values of many flat n-gram indices with a binary search over the stored keys.
+
+        Parameters:
+        - indices (np.ndarray): Flat n-gram indices, as computed by `flat_gram_indices`.
+
+        Returns:
+        - np.ndarray: The float32 values; `floor_value` for n-grams that are not stored.
+
+        Notes:
+        - The indices are converted to the dtype of `keys` (np.uint32 for most tables) before searching; otherwise
+          np.searchsorted would convert the whole key array to int64 on every call. This is lossless, since
+          all flat indices are smaller than the number of table entries.
+        """
+        indices = np.asarray(indices)
+        if self.keys.size == 0:
+            return np.full(indices.shape, self.floor_value, dtype=np.float32)
+        indices = indices.astype(self.keys.dtype, copy=False)
+        positions = np.searchsorted(self.keys, indices)
+        np.minimum(positions, self.keys.size - 1, out=positions)
+        found = self.keys[positions] == indices
+        return np.where(found, self.values[positions], np.float32(self.floor_value))
+
+    def lookup_value(self, index):
+        """
+        Looks up the value of a single flat n-gram index.
+
+        Parameters:
+        - index (int): A flat n-gram index.
+
+        Returns:
+        - float: The value; `floor_value` if the n-gram is not stored.
+        """
+        position = int(np.searchsorted(self.keys, index))
+        if position < self.keys.size and self.keys[position] == index:
+            return float(self.values[position])
+        return float(np.float32(self.floor_value))
+
+    def normalize(self, max_value):
+        """
+        Normalizes the stored values and the floor value based on the provided maximum value.
+
+        Parameters:
+        - max_value (float): The maximum value used for normalization.
+
+        Raises:
+        - Exception: If the frequencies have already been normalized.
+
+        Notes:
+        - Adjusts all values proportionally to the new maximum value, like the dense grams classes do.
+        - Updates `self.max_value` to the new maximum after normalization.
+        """
+        if self.is_normalized:
+            raise Exception("This Gram object has already been normalized!")
+        self.is_normalized = True
+        adjust_value = self.max_value * max_value
+        np.divide(adjust_value, self.values, out=self.values)
+        self.floor_value = float(np.float32(adjust_value / np.float32(self.floor_value)))
+        self.max_value = self.maximum()
+
+    def table_bytes(self):
+        """
+        Returns the memory used by the stored n-grams.
+
+        Returns:
+        - int: The number of bytes of `keys` and `values`.
+        """
+        return self.keys.nbytes + self.values.nbytes
+
+    def quantize(self, dtype):
+        """
+        Not supported: sparse grams only store float32 values.
+
+        Raises:
+        - Exception: Always.
+        """
+        raise Exception("SparseGrams cannot be quantized!")
@@ -0,0 +1,261 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+import codecs
+import threading
+from collections.abc import Sequence
+import numpy as np
+
+class SymbolMapper:
+    """
+    Precompiled mapping between the characters of an alphabet and their positions in number space.
+
+    The mapper holds a lookup table indexed by Unicode code point, so a text is mapped with a single
+    NumPy gather instead of searching the alphabet for every character. Mappers are cached per alphabet;
+    use `for_alphabet` to get one.
+
+    Attributes:
+    - alphabet (str): The alphabet of the mapper (a list of characters is joined into a string).
+    - code_to_number (np.ndarray): Maps a code point to its position in the alphabet, or -1 for unknown characters.
+      The last entry is always -1 and is used for all code points beyond the table.
+    - number_to_code (np.ndarray): The code points of the alphabet, indexed by position.
+    - mappers (dict): The cached mappers, keyed by alphabet string (see `alphabet_key`).
+    """
+
+    mappers = {}
+    mappers_lock = threading.Lock()
+
+    def __init__(self, alphabet):
+        """
+        Builds the lookup table of an alphabet. Use `for_alphabet` to reuse cached mappers.
+
+        Parameters:
+        - alphabet (str): The alphabet for mapping.
+        """
+        self.alphabet = SymbolMapper.alphabet_key(alphabet)
+        if self.alphabet is None:
+            raise ValueError("Every symbol of the alphabet must be a single character")
+        alphabet = self.alphabet
+        code_points = [ord(c) for c in alphabet]
+        self.code_to_number = np.full(max(code_points, default=-1) + 2, -1, dtype=np.int32)
+        # Iterate backwards so that duplicate characters map to their first position, like str.index does.
+        for number in range(len(code_points) - 1, -1, -1):
+            self.code_to_number[code_points[number]] = number
+        self.number_to_code = np.array(code_points, dtype=np.uint32)
+
+    @staticmethod
+    def alphabet_key(alphabet):
+        """
+        Returns the string form of an alphabet, under which its mapper is cached.
+
+        Parameters:
+        - alphabet (str or iterable): The alphabet, e.g. a string or a list of characters.
+
+        Returns:
+        - str or None: The alphabet as a string, or None if a symbol is not a single character
+          (such alphabets cannot be mapped with a code point table).
+        """
+        if isinstance(alphabet, str):
+            return alphabet
+        symbols = list(alphabet)
+        if not all(isinstance(symbol, str) and len(symbol) == 1 for symbol in symbols):
+            return None
+        return "".join(symbols)
+
+    @staticmethod
+    def for_alphabet(alphabet):
+        """
+        Returns the cached mapper of an alphabet, building it on first use.
+
+        Parameters:
+        - alphabet (str or list): The alphabet for mapping, as a string or a list of single characters.
+
+        Returns:
+        - SymbolMapper: The mapper of the alphabet.
+
+        Raises:
+        - ValueError: If a symbol of the alphabet is not a single character.
+        """
+        key = SymbolMapper.alphabet_key(alphabet)
+        if key is None:
+            raise ValueError("Every symbol of the alphabet must be a single character")
+        mapper = SymbolMapper.mappers.get(key)
+        if mapper is None:
+            with SymbolMapper.mappers_lock:
+                mapper = SymbolMapper.mappers.get(key)
+                if mapper is None:
+                    mapper = SymbolMapper(key)
+                    SymbolMapper.mappers[key] = mapper
+        return mapper
+
+    def number_dtype(self, replace_number=-1):
+        """
+        Returns the smallest integer type that holds all positions of the alphabet and the replacement number.
+
+        Parameters:
+        - replace_number (int): Replacement number for unknown characters (default: -1).
+
+        Returns:
+        - np.dtype: np.int8 or np.int16 for all supported alphabets; np.int64 for very large values.
+        """
+        lowest = min(replace_number, -1)
+        highest = max(replace_number, len(self.alphabet) - 1)
+        for dtype in (np.int8, np.int16, np.int32):
+            if np.iinfo(dtype).min <= lowest and highest <= np.iinfo(dtype).max:
+                return np.dtype(dtype)
+        return np.dtype(np.int64)
+
+    def text_to_numbers(self, text, remove_unknown=True, replace_number=-1):
+        """
+        Maps text into number space.
+
+        Parameters:
+        - text (str): The input text.
+        - remove_unknown (bool): Whether to remove characters that are not part of the alphabet; otherwise
+          they are replaced by `replace_number` (default: True).
+        - replace_number (int): Replacement number for unknown characters (default: -1).
+
+        Returns:
+        - np.ndarray: The positions of the characters in the alphabet, as an array of `number_dtype(replace_number)`.
+        """
+        if not isinstance(text, str):
+            text = "".join(text)
+        code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        numbers = self.code_to_number[np.minimum(code_points, self.code_to_number.size - 1)]
+        if remove_unknown:
+            numbers = numbers[numbers >= 0]
+        elif replace_number != -1:
+            numbers = np.where(numbers >= 0, numbers, replace_number)
+        return numbers.astype(self.number_dtype(replace_number), copy=False)
+
+    def code_points(self, numbers, remove_unknown=True, replace_code_point=0):
+        """
+        Maps numbers to the code points of their characters.
+
+        Parameters:
+        - numbers (np.ndarray): The numbers to map.
+        - remove_unknown (bool): Whether to remove numbers outside of the alphabet; otherwise their
+          code point is `replace_code_point` (default: True).
+        - replace_code_point (int): The code point used for unknown numbers (default: 0).
+
+        Returns:
+        - tuple: (code_points, known), the np.uint32 code points and the mask of known numbers of the input.
+        """
+        known = (numbers >= 0) & (numbers < len(self.alphabet))
+        if remove_unknown:
+            return self.number_to_code[numbers[known]], known
+        code_points = np.full(numbers.shape, replace_code_point, dtype=np.uint32)
+        code_points[known] = self.number_to_code[numbers[known]]
+        return code_points, known
+
+    def numbers_to_text(self, numbers, remove_unknown=True, replace_character='?'):
+        """
+        Maps numbers into text.
+
+        Parameters:
+        - numbers (iterable): The numbers to map, e.g. a list, a NumPy array or a generator.
+        - remove_unknown (bool): Whether to remove numbers that are outside of the alphabet; otherwise
+          they are replaced by `replace_character` (default: True).
+        - replace_character (str): Replacement for unknown numbers (default: '?').
+
+        Returns:
+        - str: The resulting string.
+        """
+        if isinstance(numbers, (np.ndarray, Sequence)):
+            numbers = np.asarray(numbers, dtype=np.int64).ravel()
+        else:
+            numbers = np.fromiter(numbers, dtype=np.int64)
+        if remove_unknown or len(replace_character) == 1:
+            code_points = self.code_points(numbers, remove_unknown, ord(replace_character) if not remove_unknown else 0)[0]
+            return code_points.tobytes().decode('utf-32-le')
+        # A replacement of zero or several characters cannot be expressed as a single code point.
+        known = (numbers >= 0) & (numbers < len(self.alphabet))
+        characters = np.array(list(self.alphabet) + [replace_character], dtype=object)
+        return "".join(characters[np.where(known, numbers, len(self.alphabet))])
+
+    def number_matrix_to_texts(self, numbers, remove_unknown=True, replace_character='?'):
+        """
+        Maps every row of a 2-D matrix of numbers into text.
+
+        Parameters:
+        - numbers (np.ndarray): The 2-D matrix of numbers, one candidate per row.
+        - remove_unknown (bool): Whether to remove numbers that are outside of the alphabet; otherwise
+          they are replaced by `replace_character` (default: True).
+        - replace_character (str): Replacement for unknown numbers (default: '?').
+
+        Returns:
+        - list: One string per row.
+
+        Notes:
+        - All rows are decoded with a single string conversion and then split into the row strings.
+        """
+        numbers = np.asarray(numbers, dtype=np.int64)
+        if numbers.ndim != 2:
+            raise ValueError(f"Expected a 2-D matrix of numbers, got {numbers.ndim} dimension(s)")
+        if not remove_unknown and len(replace_character) != 1:
+            return [self.numbers_to_text(row, remove_unknown, replace_character) for row in numbers]
+
+        code_points, known = self.code_points(numbers, remove_unknown, ord(replace_character) if not remove_unknown else 0)
+        text = code_points.tobytes().decode('utf-32-le')
+        if remove_unknown:
+            ends = np.cumsum(np.count_nonzero(known, axis=1)).tolist()
+        else:
+            ends = range(numbers.shape[1], numbers.size + 1, numbers.shape[1]) if numbers.shape[1] > 0 else [0] * numbers.shape[0]
+        texts = []
+        start = 0
+        for end in ends:
+            texts.append(text[start:end])
+            start = end
+        return texts
+
+    def iterate_numbers(self, source, remove_unknown=True, replace_number=-1, overlap=0, chunk_size=1 << 20, uppercase=True):
+        """
+        Maps a stream of text into number space chunk by chunk.
+
+        Parameters:
+        - source (file object or iterable): A text or binary (UTF-8) file object, or an iterable of str or bytes chunks.
+        - remove_unknown (bool): Whether to remove characters that are not part of the alphabet; otherwise
+          they are replaced by `replace_number` (default: True).
+        - replace_number (int): Replacement number for unknown characters (default: -1).
+        - overlap (int): The number of symbols of the previous output repeated at the start of each chunk,
+          e.g. gram size - 1 to score every n-gram exactly once (default: 0).
+        - chunk_size (int): The number of characters (or bytes) read from a file object at once (default: 1 MiB).
+        - uppercase (bool): Whether to upper-case the text before mapping (default: True).
+
+        Yields:
+        - np.ndarray: The numbers of each chunk, as an array of `number_dtype(replace_number)`, prefixed with the
+          last `overlap` numbers yielded before. Chunks without new symbols are skipped.
+        """
+        chunks = source
+        if hasattr(source, "read"):
+            chunks = iter(lambda: source.read(chunk_size), source.read(0))
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        carry = np.zeros(0, dtype=self.number_dtype(replace_number))
+
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                chunk = decoder.decode(chunk)
+            if uppercase:
+                chunk = chunk.upper()
+            numbers = self.text_to_numbers(chunk, remove_unknown, replace_number)
+            if numbers.size == 0:
+                continue
+            if overlap > 0:
+                numbers = np.concatenate((carry, numbers))
+                carry = numbers[-overlap:]
+            yield numbers
+
+        # Surface truncated UTF-8 sequences at the end of a binary stream.
+        decoder.decode(b"", final=True)
@@ -20,7 +20,7 @@ from languagestatisticslibpy.GramsType import GramsType
 from languagestatisticslibpy.LanguageStatisticsFile import LanguageStatisticsFile
 
 class Unigrams(Grams):
-    def __init__(self, language, language_statistics_directory, use_spaces=False):
+    def __init__(self, language, language_statistics_directory, use_spaces=False, use_cache=False, normalize_to=None, lazy=False, progress_callback=None):
         """
         Initializes the Unigrams class by calling the parent class (Grams) initializer.
 
@@ -28,16 +28,23 @@ class Unigrams(Grams):
         - language (str): The language of the unigram statistics.
         - language_statistics_directory (str): Path to the directory containing language statistics files.
         - use_spaces (bool): Whether to include spaces in the analysis (default: False).
+        - use_cache (bool): Whether to use memory-mapped cache files next to the .gz file (default: False).
+        - normalize_to (float or None): If given, the frequencies are normalized to this value right after loading (default: None).
+        - lazy (bool): If True, only the file header is read now and the frequencies are loaded on first use (default: False).
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` while the
+          frequencies are read from the .gz file (default: None).
         """
-        super().__init__(language, language_statistics_directory, use_spaces)
+        super().__init__(language, language_statistics_directory, use_spaces, use_cache, normalize_to, lazy, progress_callback)
 
-    def load_gz(self, filename, language_statistics_directory):
+    def load_gz(self, filename, language_statistics_directory, progress_callback=None):
         """
         Loads a gzip-compressed file containing unigram frequencies.
 
         Parameters:
         - filename (str): The name of the file to load.
         - language_statistics_directory (str): The directory where the statistics file is located.
+        - progress_callback (callable or None): Called as `progress_callback(bytes_read, bytes_total)` after each
+          chunk of frequency data read from the .gz file (default: None).
 
         Sets:
         - self.frequencies (np.ndarray): A 1D array of unigram frequencies.
@@ -46,7 +53,7 @@ class Unigrams(Grams):
         """
         file_path = os.path.join(language_statistics_directory, filename)
         language_statistics_file = LanguageStatisticsFile(file_path)
-        self.frequencies = language_statistics_file.load_frequencies(1)
+        self.frequencies = language_statistics_file.load_frequencies(1, self.cache_raw_frequencies, progress_callback)
         self.alphabet = language_statistics_file.alphabet
         self.max_value = np.max(self.frequencies) if self.frequencies.size > 0 else float('-inf')
 
@@ -55,25 +62,20 @@ class Unigrams(Grams):
         Calculates the cost of a given text based on unigram frequencies.
 
         Parameters:
-        - text (str): The text to analyze.
+        - text (list or np.ndarray): The text to analyze, mapped into number space.
 
         Returns:
         - float: The average cost of unigrams in the text. Returns 0.0 if the text is empty.
 
         Notes:
+        - The text may be a list or a NumPy array of symbol indices; all windows are scored in one vectorized pass.
         - Skips characters that are outside the defined alphabet.
         - If `add_letter_indices` is defined, modifies the index of the character before computing the cost.
         """
         if len(text) == 0:
             return 0.0
 
-        value = 0.0
-        for i in text:
-            if self.add_letter_indices:
-                i += self.add_letter_indices.get(i, 0)
-            if 0 <= i < len(self.alphabet):
-                value += self.frequencies[i]
-        return value / len(text)
+        return self.sum_of_costs(text) / len(text)
 
     def gram_size(self):
         """
@@ -92,19 +94,3 @@ class Unigrams(Grams):
         - GramsType: An enum value representing the type of grams (GramsType.Unigrams).
         """
         return GramsType.Unigrams
-
-    def normalize(self, max_value):
-        """
-        Normalizes the unigram frequencies based on the provided maximum value.
-
-        Parameters:
-        - max_value (float): The maximum value used for normalization.
-
-        Notes:
-        - Adjusts all frequencies proportionally to the new maximum value.
-        - Updates `self.max_value` to the new maximum after normalization.
-        """
-        super().normalize(max_value)
-        adjust_value = self.max_value * max_value
-        for a in range(len(self.alphabet)):
-            self.frequencies[a] = adjust_value / self.frequencies[a]
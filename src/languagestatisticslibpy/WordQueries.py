@@ -0,0 +1,354 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+'''
+from abc import ABC, abstractmethod
+import numpy as np
+
+class WordQueries(ABC):
+    """
+    Word, prefix and match queries shared by all word tree representations.
+
+    A subclass only describes how to navigate its nodes (`root_node`, `child`, `word_ends_at` and
+    `child_items`); every query walks the tree from the root at most once per start position and never
+    materializes the word list.
+
+    Notes:
+    - Like `contains_word`, all queries are case-insensitive: words, prefixes and texts are upper-cased.
+    """
+
+    @abstractmethod
+    def root_node(self):
+        """
+        Returns the root node of the tree.
+
+        Returns:
+        - object: The root node.
+        """
+        pass
+
+    @abstractmethod
+    def child(self, node, char):
+        """
+        Looks up the child of a node for a character.
+
+        Parameters:
+        - node (object): The node.
+        - char (str): The character.
+
+        Returns:
+        - object or None: The child node, or None if there is none.
+        """
+        pass
+
+    @abstractmethod
+    def word_ends_at(self, node):
+        """
+        Returns whether a node marks the end of a word.
+
+        Parameters:
+        - node (object): The node.
+
+        Returns:
+        - bool: True if a word ends at the node.
+        """
+        pass
+
+    @abstractmethod
+    def child_items(self, node):
+        """
+        Returns the children of a node.
+
+        Parameters:
+        - node (object): The node.
+
+        Returns:
+        - list: (character, child node) pairs in the order of `to_list`.
+        """
+        pass
+
+    def find_node(self, word):
+        """
+        Follows the characters of a word from the root.
+
+        Parameters:
+        - word (str): The (already upper-cased) word.
+
+        Returns:
+        - object or None: The node reached after the last character, or None if the path does not exist.
+        """
+        node = self.root_node()
+        for char in word:
+            node = self.child(node, char)
+            if node is None:
+                return None
+        return node
+
+    def contains_word(self, word):
+        """
+        Checks whether a given word exists in the tree.
+
+        Parameters:
+        - word (str): The word to search for.
+
+        Returns:
+        - bool: True if the word is stored in the tree, False otherwise (also for mere prefixes of stored words).
+        """
+        node = self.find_node(word.upper())
+        return node is not None and self.word_ends_at(node)
+
+    def has_prefix(self, prefix):
+        """
+        Checks whether any stored word starts with the given prefix.
+
+        Parameters:
+        - prefix (str): The prefix to search for.
+
+        Returns:
+        - bool: True if at least one word starts with the prefix (or equals it).
+        """
+        return self.find_node(prefix.upper()) is not None
+
+    def iter_words_with_prefix(self, prefix, limit=None):
+        """
+        Iterates over the stored words that start with the given prefix.
+
+        Parameters:
+        - prefix (str): The prefix.
+        - limit (int or None): The maximum number of words to return (default: None, all words).
+
+        Yields:
+        - str: The (upper-case) words in the order of `to_list`, starting with the prefix itself if it is a word.
+        """
+        prefix = prefix.upper()
+        node = self.find_node(prefix)
+        if node is None or (limit is not None and limit <= 0):
+            return
+        count = 0
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if self.word_ends_at(node):
+                yield word
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            for char, child_node in reversed(self.child_items(node)):
+                stack.append((child_node, word + char))
+
+    def walk(self, text, pos):
+        """
+        Follows the characters of a text from a start position as long as they form a path in the tree.
+
+        Parameters:
+        - text (str): The text.
+        - pos (int): The start position in the text.
+
+        Yields:
+        - tuple: (end, node) for each position end > pos such that text[pos:end] is a path in the tree.
+        """
+        node = self.root_node()
+        for end in range(pos + 1, len(text) + 1):
+            for char in text[end - 1].upper():
+                node = self.child(node, char)
+                if node is None:
+                    return
+            yield end, node
+
+    def all_words_at(self, text, pos):
+        """
+        Returns all stored words that occur in a text at a given position.
+
+        Parameters:
+        - text (str): The text, e.g. a candidate plaintext without spaces.
+        - pos (int): The start position in the text.
+
+        Returns:
+        - list: The (upper-case) words, shortest first.
+        """
+        return [text[pos:end].upper() for end, node in self.walk(text, pos) if self.word_ends_at(node)]
+
+    def longest_word_at(self, text, pos):
+        """
+        Returns the longest stored word that occurs in a text at a given position.
+
+        Parameters:
+        - text (str): The text, e.g. a candidate plaintext without spaces.
+        - pos (int): The start position in the text.
+
+        Returns:
+        - str or None: The (upper-case) word, or None if no stored word starts at the position.
+        """
+        longest_end = None
+        for end, node in self.walk(text, pos):
+            if self.word_ends_at(node):
+                longest_end = end
+        if longest_end is None:
+            return None
+        return text[pos:longest_end].upper()
+
+    def query_batch(self, queries):
+        """
+        Answers prefix and word queries for many strings at once.
+
+        Parameters:
+        - queries (iterable): The strings to look up.
+
+        Returns:
+        - list: One (has_prefix, contains_word) tuple of bools per query, in the order of the queries.
+
+        Notes:
+        - The queries are sorted, and each query continues from the deepest node shared with the previous
+          query, so common prefixes are only traversed once.
+        """
+        queries = [query.upper() for query in queries]
+        answers = {}
+        path = [self.root_node()]
+        previous = ""
+        for query in sorted(set(queries)):
+            shared = 0
+            limit = min(len(previous), len(query), len(path) - 1)
+            while shared < limit and previous[shared] == query[shared]:
+                shared += 1
+            del path[shared + 1:]
+            node = path[-1]
+            for char in query[shared:]:
+                node = self.child(node, char)
+                if node is None:
+                    break
+                path.append(node)
+            if node is None:
+                answers[query] = (False, False)
+            else:
+                answers[query] = (True, self.word_ends_at(node))
+            previous = query
+        return [answers[query] for query in queries]
+
+    def segment(self, text, min_word_length=1):
+        """
+        Splits a text without spaces into dictionary words so that as many characters as possible are covered.
+
+        Parameters:
+        - text (str): The text, e.g. a candidate plaintext without spaces.
+        - min_word_length (int): Words shorter than this do not count (default: 1).
+
+        Returns:
+        - tuple: (coverage, segments)
+          - coverage (float): The fraction of characters covered by dictionary words (0.0 for an empty text).
+          - segments (list): (string, is_word) tuples that concatenate to the upper-cased text; uncovered
+            characters are grouped into runs with is_word False.
+
+        Notes:
+        - A single left-to-right dynamic program: from each position, the tree is walked along the text once
+          to find all words starting there. Among segmentations with the same coverage, the one with the
+          fewest words is returned.
+        """
+        text = text.upper()
+        length = len(text)
+        covered, words, previous = self.segment_table(text, min_word_length, True)
+
+        segments = []
+        end = length
+        while end > 0:
+            start = previous[end]
+            if covered[end] - covered[start] != end - start:
+                if segments and not segments[-1][1]:
+                    segments[-1] = (text[start] + segments[-1][0], False)
+                else:
+                    segments.append((text[start], False))
+            else:
+                segments.append((text[start:end], True))
+            end = start
+        segments.reverse()
+        return (covered[length] / length if length > 0 else 0.0), segments
+
+    def coverage(self, text, min_word_length=1):
+        """
+        Returns the fraction of a text without spaces that can be covered by dictionary words.
+
+        Parameters:
+        - text (str): The text, e.g. a candidate plaintext without spaces.
+        - min_word_length (int): Words shorter than this do not count (default: 1).
+
+        Returns:
+        - float: The best coverage fraction, as returned by `segment` (0.0 for an empty text).
+        """
+        text = text.upper()
+        if not text:
+            return 0.0
+        covered = self.segment_table(text, min_word_length, False)[0]
+        return covered[len(text)] / len(text)
+
+    def coverage_batch(self, texts, min_word_length=1):
+        """
+        Returns the dictionary coverage of many candidate texts, e.g. as a fitness function in a search loop.
+
+        Parameters:
+        - texts (iterable): The texts; candidates in number space can be converted with
+          `LanguageStatistics.map_number_matrix_into_text_space`.
+        - min_word_length (int): Words shorter than this do not count (default: 1).
+
+        Returns:
+        - np.ndarray: A 1D float64 array with the coverage of each text.
+
+        Notes:
+        - Object trees score the texts one by one. CompactWordTree overrides this with a dynamic program that
+          advances all texts together with vectorized child lookups.
+        """
+        return np.array([self.coverage(text, min_word_length) for text in texts], dtype=np.float64)
+
+    def segment_table(self, text, min_word_length, track_words):
+        """
+        Runs the dynamic program of `segment` over an upper-cased text.
+
+        Parameters:
+        - text (str): The upper-cased text.
+        - min_word_length (int): Words shorter than this do not count.
+        - track_words (bool): Whether to prefer fewer words and record the back pointers.
+
+        Returns:
+        - tuple: (covered, words, previous); covered[i] is the best number of covered characters of text[:i],
+          words[i] the number of words of that solution and previous[i] where its last segment starts
+          (words and previous are None if `track_words` is False).
+        """
+        length = len(text)
+        root = self.root_node()
+        covered = [-1] * (length + 1)
+        covered[0] = 0
+        words = [0] * (length + 1) if track_words else None
+        previous = [0] * (length + 1) if track_words else None
+
+        for start in range(length):
+            base = covered[start]
+            # Leave the character uncovered.
+            if base > covered[start + 1] or (track_words and base == covered[start + 1] and words[start] < words[start + 1]):
+                covered[start + 1] = base
+                if track_words:
+                    words[start + 1] = words[start]
+                    previous[start + 1] = start
+            # Cover text[start:end] with a word.
+            node = root
+            for end in range(start + 1, length + 1):
+                node = self.child(node, text[end - 1])
+                if node is None:
+                    break
+                if end - start < min_word_length or not self.word_ends_at(node):
+                    continue
+                value = base + end - start
+                if value > covered[end] or (track_words and value == covered[end] and words[start] + 1 < words[end]):
+                    covered[end] = value
+                    if track_words:
+                        words[end] = words[start] + 1
+                        previous[end] = start
+        return covered, words, previous
@@ -13,23 +13,36 @@
    See the License for the specific language governing permissions and
    limitations under the License.
 '''
+import gc
+import re
+import threading
 from io import BufferedReader
 from collections import deque
 from languagestatisticslibpy.Node import Node
+from languagestatisticslibpy.WordQueries import WordQueries
 
-class WordTree(Node):
+class WordTree(Node, WordQueries):
     """
     Represents a tree data structure for storing words and efficiently querying them.
 
     Inherits:
     - Node: The base class for tree nodes, where each node represents a character.
+    - WordQueries: The word, prefix and match queries (`contains_word`, `has_prefix`, `longest_word_at`, ...).
 
     Attributes:
     - stored_words (int): The number of words stored in the tree.
     - language_code (str): The language code for the words stored in the tree.
     - alphabet (str): The alphabet used in the stored words.
+    - gc_pause_count (int): The number of bodies currently being loaded with the garbage collector paused (class-wide).
+    - gc_enabled_before_pause (bool): Whether the garbage collector was enabled when the first of them started (class-wide).
     """
 
+    gc_pause_lock = threading.Lock()
+    gc_pause_count = 0
+    gc_enabled_before_pause = False
+
+    BODY_RUN_PATTERN = re.compile(f"[^{Node.WordEndSymbol}{Node.TerminationSymbol}]+|{Node.WordEndSymbol}|{Node.TerminationSymbol}+")
+
     def __init__(self):
         """
         Initializes an empty WordTree.
@@ -62,77 +75,185 @@ class WordTree(Node):
         1. Reads the file header and validates the magic number.
         2. Reads the language code and alphabet.
         3. Reads the number of stored words.
-        4. Constructs the WordTree structure by iterating through the file's serialized data.
+        4. Reads the rest of the file at once and constructs the WordTree structure from it (see `load_body`).
         """
         tree = WordTree()
+        tree.language_code, tree.alphabet, tree.stored_words = WordTree.read_header(reader)
+        tree.load_body(reader.read())
+        return tree
 
-        # Load word tree header
-        magic_no = reader.read(6).decode('utf-8')
-        if magic_no != "CT2DIC":
-            raise Exception("File does not start with the expected magic number for word tree.")
+    def load_body(self, data):
+        """
+        Constructs the WordTree structure from the serialized body of a dictionary (everything after the header).
 
-        # Read language code
-        tree.language_code = ''
-        char = reader.read(1).decode('utf-8')
-        while char != '\0':
-            tree.language_code += char
-            char = reader.read(1).decode('utf-8')
+        Parameters:
+        - data (bytes, bytearray or memoryview): The UTF-8 encoded body.
 
-        # Read alphabet
-        tree.alphabet = ''
-        char = reader.read(1).decode('utf-8')
-        while char != '\0':
-            tree.alphabet += char
-            char = reader.read(1).decode('utf-8')
+        Notes:
+        - The body is a depth-first listing of the tree: a character adds a child node and descends into it,
+          `Node.WordEndSymbol` marks the current node as the end of a word, and `Node.TerminationSymbol` goes
+          back to the parent node.
+        - The body is decoded once and split into runs of characters and runs of symbols with a regular
+          expression, so each run is handled with a single step instead of one `read` per byte.
+        - Increments `stored_words` by the number of word ends, like reading the body node by node does.
+        - The garbage collector is paused while building: it would otherwise rescan the growing tree
+          again and again, which takes more time than creating the nodes. The pause is shared by concurrent
+          loads (see `pause_gc`), so the collector is only switched back on by the last of them, and only if
+          it was enabled before.
+        """
+        body = str(data, 'utf-8')
+        WordTree.pause_gc()
+        try:
+            self.load_runs(WordTree.BODY_RUN_PATTERN.findall(body))
+        finally:
+            WordTree.resume_gc()
+        self.stored_words += body.count(Node.WordEndSymbol)
 
-        # Read number of stored words
-        tree.stored_words = int.from_bytes(reader.read(4), 'little')
-
-        # Load word tree data structure
-        stack = deque([tree])
-        byte = reader.read(1)
-        while byte:
-            char = byte.decode('utf-8')
-            if char == Node.WordEndSymbol:
+    @staticmethod
+    def pause_gc():
+        """
+        Disables the garbage collector for a load, remembering its state if no other load is running.
+        """
+        with WordTree.gc_pause_lock:
+            if WordTree.gc_pause_count == 0:
+                WordTree.gc_enabled_before_pause = gc.isenabled()
+                gc.disable()
+            WordTree.gc_pause_count += 1
+
+    @staticmethod
+    def resume_gc():
+        """
+        Ends the pause of a load; the last running load restores the state remembered by `pause_gc`.
+        """
+        with WordTree.gc_pause_lock:
+            WordTree.gc_pause_count -= 1
+            if WordTree.gc_pause_count == 0 and WordTree.gc_enabled_before_pause:
+                gc.enable()
+
+    def load_runs(self, runs):
+        """
+        Constructs the WordTree structure from the runs of the serialized body (see `load_body`).
+
+        Parameters:
+        - runs (list): Runs of characters, single word end symbols and runs of termination symbols.
+        """
+        stack = [self]
+        for run in runs:
+            first = run[0]
+            if first == Node.TerminationSymbol:
+                del stack[-len(run):]
+            elif first == Node.WordEndSymbol:
                 stack[-1].word_ends_here = True
-                tree.stored_words += 1
-            elif char == Node.TerminationSymbol:
-                stack.pop()
             else:
-                new_node = Node(char)
-                stack[-1].child_nodes.append(new_node)
-                stack.append(new_node)
+                node = stack[-1]
+                for char in run:
+                    child_nodes = node.child_nodes
+                    child_node = child_nodes.get(char)
+                    if child_node is None:
+                        child_node = Node(char)
+                        child_nodes[char] = child_node
+                    node = child_node
+                    stack.append(node)
+
+    @staticmethod
+    def read_header(reader: BufferedReader):
+        """
+        Reads the header of a serialized WordTree.
+
+        Parameters:
+        - reader (BufferedReader): A binary file reader positioned at the start of the serialized WordTree.
+
+        Returns:
+        - tuple: (language_code, alphabet, stored_words) as stored in the header.
+
+        Raises:
+        - Exception: If the file format is invalid or the magic number does not match.
+        """
+        magic_no = reader.read(6).decode('utf-8')
+        if magic_no != "CT2DIC":
+            raise Exception("File does not start with the expected magic number for word tree.")
+
+        # Read language code and alphabet (null-terminated; decoded as a whole to support multi-byte characters)
+        strings = []
+        for _ in range(2):
+            data = bytearray()
             byte = reader.read(1)
+            while byte and byte != b'\0':
+                data += byte
+                byte = reader.read(1)
+            strings.append(data.decode('utf-8'))
+        language_code, alphabet = strings
 
-        return tree
+        # Read number of stored words
+        stored_words = int.from_bytes(reader.read(4), 'little')
+        return language_code, alphabet, stored_words
+
+    def root_node(self):
+        """
+        Returns the root node of the tree (the WordTree itself).
+
+        Returns:
+        - WordTree: The root node.
+        """
+        return self
+
+    def child(self, node, char):
+        """
+        Looks up the child of a node for a character.
+
+        Parameters:
+        - node (Node): The node.
+        - char (str): The character.
+
+        Returns:
+        - Node or None: The child node, or None if there is none.
+        """
+        return node.child_nodes.get(char)
+
+    def word_ends_at(self, node):
+        """
+        Returns whether a node marks the end of a word.
+
+        Parameters:
+        - node (Node): The node.
+
+        Returns:
+        - bool: The `word_ends_here` flag of the node.
+        """
+        return node.word_ends_here
+
+    def child_items(self, node):
+        """
+        Returns the children of a node.
+
+        Parameters:
+        - node (Node): The node.
+
+        Returns:
+        - list: (character, child node) pairs in insertion order.
+        """
+        return list(node.child_nodes.items())
 
-    def contains_word(self, word):
+    def find_node(self, word):
         """
-        Checks whether a given word exists in the WordTree.
+        Follows the characters of a word from the root.
 
         Parameters:
-        - word (str): The word to search for.
+        - word (str): The (already upper-cased) word.
 
         Returns:
-        - bool: True if the word exists in the tree, False otherwise.
+        - Node or None: The node reached after the last character, or None if the path does not exist.
 
         Process:
-        1. Converts the word to uppercase for case-insensitive comparison.
-        2. Traverses the tree to find the sequence of characters in the word.
-        3. Returns False if any character is missing in the tree structure.
+        1. Traverses the tree to find the sequence of characters in the word, looking up each child by its character.
+        2. Returns None if any character is missing in the tree structure.
         """
-        word = word.upper()
         current_node = self
         for char in word:
-            found_node = None
-            for child_node in current_node.child_nodes:
-                if child_node.value == char:
-                    current_node = child_node
-                    found_node = True
-                    break
-            if not found_node:
-                return False
-        return True
+            current_node = current_node.child_nodes.get(char)
+            if current_node is None:
+                return None
+        return current_node
 
     def to_list(self):
         """
@@ -152,11 +273,11 @@ class WordTree(Node):
             stack.append(node.value)
             if node.word_ends_here:
                 list_of_words.append(''.join(stack))
-            for child_node in node.child_nodes:
+            for child_node in node.child_nodes.values():
                 add_node_to_list(child_node, deque(stack))
             stack.pop()
 
-        for node in self.child_nodes:
+        for node in self.child_nodes.values():
             add_node_to_list(node, stack)
 
         return list_of_words
\ No newline at end of file
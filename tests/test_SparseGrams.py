@@ -0,0 +1,71 @@
+'''
+   Copyright 2024 Nils Kopal, Bernhard Esslinger, CrypTool Team
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+   Usage: python3 -m unittest discover tests (or pytest tests)
+'''
+import copy
+import gzip
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from languagestatisticslibpy.SparseGrams import SparseGrams
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def write_statistics_file(directory, gram_size, frequencies):
+    """
+    Writes a language statistics file for the language 'en' without spaces.
+    """
+    path = os.path.join(directory, f"en-{gram_size}gram-nocs.gz")
+    with gzip.open(path, 'wb') as file:
+        file.write(b"CTLS" + bytes([2]) + b"en" + struct.pack('<i', gram_size) + bytes([len(ALPHABET)]) + ALPHABET.encode('utf-8'))
+        file.write(np.asarray(frequencies, dtype='<f4').tobytes())
+
+
+class SparseGramsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        frequencies = np.full(len(ALPHABET) ** 3, -12.0, dtype=np.float32)
+        observed = rng.choice(frequencies.size, frequencies.size // 10, replace=False)
+        frequencies[observed] = rng.random(observed.size, dtype=np.float32) * -10
+        write_statistics_file(self.directory.name, 3, frequencies)
+        self.grams = SparseGrams("en", self.directory.name, gram_size=3, floor_value=-12.0)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookup_is_independent_of_key_dtype(self):
+        self.assertEqual(self.grams.keys.dtype, np.uint32)
+        wide_grams = copy.copy(self.grams)
+        wide_grams.keys = self.grams.keys.astype(np.int64)
+
+        indices = np.arange(len(ALPHABET) ** 3, dtype=np.int64)
+        np.testing.assert_array_equal(self.grams.lookup(indices), wide_grams.lookup(indices))
+
+        texts = np.random.default_rng(1).integers(-1, len(ALPHABET), (20, 50))
+        np.testing.assert_array_equal(self.grams.calculate_cost_batch(texts), wide_grams.calculate_cost_batch(texts))
+
+
+if __name__ == "__main__":
+    unittest.main()